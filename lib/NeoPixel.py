@@ -34,6 +34,7 @@ print(f"Baseline magnitude: {baseline:.3f}")
 
 # 阈值与连续计数
 threshold = baseline + 0.8   # 可以根据实验调节，比如 +0.5, +1.0
+threshold_sq = threshold * threshold   # 循环里比较平方，省掉每次的 sqrt
 required_count = 5           # 连续 5 次超过阈值才算运动
 
 motion_count = 0
@@ -46,10 +47,10 @@ print("Start monitoring motion...")
 
 while True:
     x, y, z = accelerometer.acceleration
-    mag = math.sqrt(x * x + y * y + z * z)
+    mag_sq = x * x + y * y + z * z
 
     # 判断是否超过阈值
-    if mag >= threshold:
+    if mag_sq >= threshold_sq:
         motion_count += 1
     else:
         motion_count = 0
@@ -70,9 +71,9 @@ while True:
 
     # 可选：打印调试信息（想干净一点可以注释掉）
     print(
-        f"Mag: {mag:.3f}  "
+        f"Mag^2: {mag_sq:.3f}  "
         f"Baseline: {baseline:.3f}  "
-        f"Threshold: {threshold:.3f}  "
+        f"Threshold^2: {threshold_sq:.3f}  "
         f"Count: {motion_count}"
     )
 
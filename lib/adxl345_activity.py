@@ -0,0 +1,157 @@
+from micropython import const
+
+_ADDRESS = const(0x53)
+_REG_THRESH_TAP = const(0x1D)
+_REG_DUR = const(0x21)
+_REG_LATENT = const(0x22)
+_REG_WINDOW = const(0x23)
+_REG_THRESH_ACT = const(0x24)
+_REG_THRESH_INACT = const(0x25)
+_REG_TIME_INACT = const(0x26)
+_REG_ACT_INACT_CTL = const(0x27)
+_REG_TAP_AXES = const(0x2A)
+_REG_INT_ENABLE = const(0x2E)
+_REG_INT_MAP = const(0x2F)
+_REG_INT_SOURCE = const(0x30)
+
+INT_SINGLE_TAP = const(0x40)
+INT_DOUBLE_TAP = const(0x20)
+INT_ACTIVITY = const(0x10)
+INT_INACTIVITY = const(0x08)
+_MOTION_INTS = const(0x18)
+
+# 活动 / 静止两个引擎都用 AC 耦合（和启用时的参考值比较），三个轴都参与
+_ACT_INACT_AC_XYZ = const(0xFF)
+
+# THRESH_ACT / THRESH_INACT / THRESH_TAP 的单位是 62.5 mg，TIME_INACT 的单位是 1 s
+MS2_PER_THRESH_LSB = 0.0625 * 9.80665
+
+
+def _thresh_code(ms2):
+    return max(1, min(255, int(ms2 / MS2_PER_THRESH_LSB + 0.5)))
+
+
+class Adxl345Activity:
+    """
+    Adxl345Activity(i2c, *, shake_ms2=6.0, still_ms2=0.4, still_s=0.6, address=0x53, bus=None)
+
+    Lets the ADXL345's activity / inactivity and tap engines watch for motion.
+
+    - shake_ms2: activity threshold; any axis moving further than this from
+      its reference latches ACTIVITY
+    - still_ms2 / still_s: every axis staying within still_ms2 of its reference
+      for still_s seconds latches INACTIVITY
+    - bus: optional BusClient (bus_scheduler) told about every bus job
+
+    The chip has a 62.5 mg (0.61 m/s^2) threshold step and a 1 s time step, so
+    the values are rounded; shake_thresh / still_thresh / still_time hold what
+    was actually programmed. Both engines are AC-coupled: the reference is
+    the attitude at arm() time, which plays the role of the software baseline.
+
+    Call arm() when a command starts (it restarts the inactivity timer and
+    clears old latches) and poll() once per frame: it is a single one-byte read
+    of INT_SOURCE and returns every enabled INT_* bit that has latched, so one
+    read serves the motion and the tap engines together. Something else that
+    reads INT_SOURCE anyway (Adxl345Fifo.drain() does) can hand the byte to
+    latched() instead, saving the extra read.
+
+    enable_double_tap() sets up the tap engine once, with the same raw register
+    values as adafruit_adxl34x's enable_tap_detection(); it stays on across
+    arm() / disarm(). clear() drops stale latches, e.g. taps made before the
+    command that asks for them.
+    """
+
+    def __init__(self, i2c, *, shake_ms2=6.0, still_ms2=0.4, still_s=0.6, address=_ADDRESS,
+                 bus=None):
+        self._i2c = i2c
+        self._bus = bus
+        self._address = address
+        self._cmd = bytearray(1)
+        self._byte = bytearray(1)
+        self.armed = False
+        self._taps = 0
+
+        act = _thresh_code(shake_ms2)
+        inact = _thresh_code(still_ms2)
+        seconds = max(1, min(255, int(still_s + 0.999)))
+        self.shake_thresh = act * MS2_PER_THRESH_LSB
+        self.still_thresh = inact * MS2_PER_THRESH_LSB
+        self.still_time = seconds
+
+        self._write(_REG_INT_ENABLE, 0)
+        self._write(_REG_THRESH_ACT, act)
+        self._write(_REG_THRESH_INACT, inact)
+        self._write(_REG_TIME_INACT, seconds)
+        self._write(_REG_INT_MAP, 0)
+
+    def _lock(self):
+        while not self._i2c.try_lock():
+            pass
+        if self._bus is not None:
+            self._bus.begin()
+
+    def _unlock(self):
+        self._i2c.unlock()
+        if self._bus is not None:
+            self._bus.end()
+
+    def _write(self, reg, value):
+        self._lock()
+        try:
+            self._i2c.writeto(self._address, bytes((reg, value)))
+        finally:
+            self._unlock()
+
+    def _read_source(self):
+        self._lock()
+        try:
+            self._cmd[0] = _REG_INT_SOURCE
+            self._i2c.writeto_then_readfrom(self._address, self._cmd, self._byte)
+        finally:
+            self._unlock()
+        return self._byte[0]
+
+    def _enabled(self):
+        return (_MOTION_INTS if self.armed else 0) | self._taps
+
+    def enable_double_tap(self, *, threshold=20, duration=50, latency=20, window=255):
+        """
+        threshold: 62.5 mg/LSB; duration: longest tap, 625 us/LSB;
+        latency: quiet time after the first tap, window: time left for the
+        second one, both 1.25 ms/LSB. Tap detection uses all three axes.
+        """
+        self._taps = 0
+        self._write(_REG_INT_ENABLE, self._enabled())
+        self._write(_REG_THRESH_TAP, threshold)
+        self._write(_REG_DUR, duration)
+        self._write(_REG_LATENT, latency)
+        self._write(_REG_WINDOW, window)
+        self._write(_REG_TAP_AXES, 0b111)
+        self._taps = INT_DOUBLE_TAP
+        self._write(_REG_INT_ENABLE, self._enabled())
+
+    def arm(self):
+        """Take new references, restart the inactivity timer and drop old latches."""
+        self._write(_REG_INT_ENABLE, self._taps)
+        self._write(_REG_ACT_INACT_CTL, _ACT_INACT_AC_XYZ)
+        self._read_source()
+        self.armed = True
+        self._write(_REG_INT_ENABLE, self._enabled())
+
+    def disarm(self):
+        if not self.armed:
+            return
+        self.armed = False
+        self._write(_REG_INT_ENABLE, self._enabled())
+
+    def clear(self):
+        """Read INT_SOURCE once and forget what was latched."""
+        self._read_source()
+
+    def latched(self, source):
+        """The enabled INT_* bits of an INT_SOURCE value read elsewhere (Adxl345Fifo.source)."""
+        return source & self._enabled()
+
+    def poll(self):
+        """One INT_SOURCE read; returns the enabled INT_* bits that fired."""
+        return self.latched(self._read_source())
@@ -0,0 +1,99 @@
+import time
+from array import array
+
+from ticks import ticks_diff
+
+DEFAULT_NAMES = ("display", "accel")
+
+
+class BusClient:
+    """One device's handle on a BusScheduler (see BusScheduler.client)."""
+
+    def __init__(self, scheduler, index):
+        self._scheduler = scheduler
+        self.index = index
+
+    def begin(self):
+        self._scheduler.begin(self.index)
+
+    def end(self):
+        self._scheduler.end(self.index)
+
+    def may_start(self, now, cost_ms):
+        return self._scheduler.may_start(self.index, now, cost_ms)
+
+
+class BusScheduler:
+    """
+    BusScheduler(frequency, *, names=("display", "accel"), max_defer_ms=100)
+
+    Shares one busio.I2C between the OLED and the sensors.
+
+    - frequency: the SCL clock the busio.I2C was created with, for report()
+    - names: one entry per device; client(name) hands out its handle
+    - max_defer_ms: longest a job may be held back by may_start()
+
+    Drivers wrap each bus job in begin() / end() on their client, and the
+    time in between is added to that device's busy total. With `priority`
+    on, may_start(now, cost_ms) only lets a low-priority job (the display
+    refresh) start when it is expected to be done by `sensor_due`, the next
+    time the sensor will read; a job held back for max_defer_ms goes anyway,
+    so the screen never freezes. `now` and `sensor_due` are ticks.ticks_ms()
+    values. A refresh is one call into displayio and
+    cannot be split, so it is moved into a gap instead.
+    """
+
+    def __init__(self, frequency, *, names=DEFAULT_NAMES, max_defer_ms=100):
+        self.frequency = frequency
+        self.names = tuple(names)
+        self.max_defer_ms = max_defer_ms
+        self.priority = False
+        self.sensor_due = None
+        n = len(self.names)
+        self._busy_us = [0] * n
+        self._jobs = array("L", [0] * n)
+        self._deferred = array("L", [0] * n)
+        self._held_since = [None] * n
+        self._started = array("L", [0] * n)
+        self._clients = [BusClient(self, i) for i in range(n)]
+        self._t0 = time.monotonic_ns()
+
+    def client(self, name):
+        return self._clients[self.names.index(name)]
+
+    def begin(self, index):
+        self._started[index] = time.monotonic_ns() // 1000 & 0x3FFFFFFF
+
+    def end(self, index):
+        us = (time.monotonic_ns() // 1000 - self._started[index]) & 0x3FFFFFFF
+        self._busy_us[index] += us
+        self._jobs[index] += 1
+
+    def may_start(self, index, now, cost_ms):
+        due = self.sensor_due
+        if not self.priority or due is None or ticks_diff(due, now) >= cost_ms:
+            self._held_since[index] = None
+            return True
+        held = self._held_since[index]
+        if held is None:
+            self._held_since[index] = now
+            self._deferred[index] += 1
+        elif ticks_diff(now, held) >= self.max_defer_ms:
+            self._held_since[index] = None
+            return True
+        return False
+
+    def reset(self):
+        for i in range(len(self.names)):
+            self._busy_us[i] = 0
+            self._jobs[i] = 0
+            self._deferred[i] = 0
+        self._t0 = time.monotonic_ns()
+
+    def report(self, out=print):
+        elapsed_us = max(1, (time.monotonic_ns() - self._t0) // 1000)
+        out("i2c @ {} kHz:".format(self.frequency // 1000))
+        for i, name in enumerate(self.names):
+            busy = self._busy_us[i]
+            out("  {:<8} {:>6} jobs {:>9.1f} ms busy ({:.1f}%) {:>5} deferred".format(
+                name, self._jobs[i], busy / 1000, 100 * busy / elapsed_us, self._deferred[i]))
@@ -0,0 +1,331 @@
+from array import array
+
+import digitalio
+from adafruit_debouncer import Button
+
+from ticks import ticks_ms, ticks_diff
+
+try:
+    import keypad
+except ImportError:
+    keypad = None   # 老版本固件没有
+
+
+class PolledButton(Button):
+    """
+    PolledButton(pin, *, pull=digitalio.Pull.UP, value_when_pressed=False,
+                 debounce_ms=10, short_duration_ms=200, long_duration_ms=500)
+
+    adafruit_debouncer.Button on a DigitalInOut it creates itself. update()
+    reads the pin and hands the level to the debouncer, so no lambda is
+    called per update. The pin is only looked at when update() runs.
+
+    - pin: board pin object (e.g. board.D2)
+    - debounce_ms: how long a new level has to hold before it counts
+    - short_duration_ms / long_duration_ms: as for Button (multi-click
+      window and long-press time)
+    """
+
+    def __init__(self, pin, *, pull=digitalio.Pull.UP, value_when_pressed=False,
+                 debounce_ms=10, short_duration_ms=200, long_duration_ms=500):
+        self._io = digitalio.DigitalInOut(pin)
+        self._io.switch_to_input(pull=pull)
+        super().__init__(
+            self._io,
+            short_duration_ms=short_duration_ms,
+            long_duration_ms=long_duration_ms,
+            value_when_pressed=value_when_pressed,
+            interval=debounce_ms / 1000,
+        )
+
+    def update(self, new_state=None):
+        super().update(self._io.value if new_state is None else new_state)
+
+    def deinit(self):
+        self._io.deinit()
+
+
+class KeypadButton:
+    """
+    One key of a KeypadButtons group, with the Debouncer / Button interface:
+    update(), value, rose / fell, pressed / released, last_duration /
+    current_duration (seconds), short_count and long_press.
+
+    Each update() takes at most one edge from the key's queue, so edges that
+    piled up while the loop was blocked come out one per update, in order.
+    Durations, clicks and long presses are measured on the edges' own scan
+    timestamps, so a late update does not stretch a short press into a
+    long one.
+    """
+
+    def __init__(self, group, key_number, short_duration_ms, long_duration_ms,
+                 value_when_pressed, queue_size):
+        self._group = group
+        self.key_number = key_number
+        self.short_duration_ms = short_duration_ms
+        self.long_duration_ms = long_duration_ms
+        self.value_when_pressed = value_when_pressed
+        # 这个键还没取走的边沿：时间戳 + 按下/松开
+        self._size = queue_size
+        self._times = array("l", [0] * queue_size)
+        self._downs = bytearray(queue_size)
+        self._head = 0
+        self._count = 0
+        self.dropped = 0
+
+        self._down = False
+        self._changed = False
+        self._changed_ticks = ticks_ms()
+        self._last_duration = 0
+        self._clicks = 0
+        self._long_registered = False
+        self.short_to_show = 0
+        self.long_to_show = False
+
+    def _queue(self, down, ticks):
+        if self._count == self._size:
+            self._head = (self._head + 1) % self._size
+            self._count -= 1
+            self.dropped += 1
+        i = (self._head + self._count) % self._size
+        self._times[i] = ticks
+        self._downs[i] = down
+        self._count += 1
+
+    def update(self, new_state=None):
+        """Take the next edge, if any (new_state is ignored: the scanner reads the pin)."""
+        self._group.pump()
+        self._changed = False
+        self.short_to_show = 0
+        self.long_to_show = False
+        if self._count:
+            i = self._head
+            self._head = (i + 1) % self._size
+            self._count -= 1
+            t = self._times[i]
+            down = self._downs[i] != 0
+            if down == self._down:
+                return
+            self._down = down
+            self._changed = True
+            self._last_duration = ticks_diff(t, self._changed_ticks)
+            self._changed_ticks = t
+            if down:
+                self._clicks += 1
+            else:
+                self._long_registered = False
+            return
+
+        # 没有新边沿：只有按住或者连按还没结束时才需要看时间
+        if not self._down and not self._clicks:
+            return
+        held = ticks_diff(ticks_ms(), self._changed_ticks)
+        if self._down:
+            if not self._long_registered and held > self.long_duration_ms:
+                self._long_registered = True
+                self.long_to_show = True
+                self.short_to_show = self._clicks - 1
+                self._clicks = 0
+        elif held > self.short_duration_ms:
+            self.short_to_show = self._clicks
+            self._clicks = 0
+
+    @property
+    def value(self):
+        return self._down == self.value_when_pressed
+
+    @property
+    def rose(self):
+        return self._changed and self.value
+
+    @property
+    def fell(self):
+        return self._changed and not self.value
+
+    @property
+    def pressed(self):
+        return self._changed and self._down
+
+    @property
+    def released(self):
+        return self._changed and not self._down
+
+    @property
+    def last_duration(self):
+        return self._last_duration / 1000
+
+    @property
+    def current_duration(self):
+        return ticks_diff(ticks_ms(), self._changed_ticks) / 1000
+
+    @property
+    def short_count(self):
+        return self.short_to_show
+
+    @property
+    def long_press(self):
+        return self.long_to_show
+
+
+class KeypadButtons:
+    """
+    KeypadButtons(pins, *, value_when_pressed=False, pull=True, debounce_ms=20,
+                  short_duration_ms=200, long_duration_ms=500, max_events=16)
+
+    Buttons scanned in the background by keypad.Keys: CircuitPython reads
+    the pins every debounce_ms, debounces them in C and queues timestamped
+    press / release events, so a press made while the main loop is blocked
+    (a display refresh, a file write) is delivered afterwards instead of
+    lost. buttons[i] is a KeypadButton for pins[i].
+
+    While no key is held and no click series is open, an update() is one
+    empty read of the event queue; Python does no other work on input
+    between events.
+
+    - pins: board pin objects; they belong to the scanner afterwards
+    - max_events: length of the C event queue and of each key's queue
+    """
+
+    def __init__(self, pins, *, value_when_pressed=False, pull=True, debounce_ms=20,
+                 short_duration_ms=200, long_duration_ms=500, max_events=16):
+        if keypad is None:
+            raise RuntimeError("keypad is not available on this board")
+        self._keys = keypad.Keys(
+            pins,
+            value_when_pressed=value_when_pressed,
+            pull=pull,
+            interval=debounce_ms / 1000,
+            max_events=max_events,
+        )
+        self._event = keypad.Event()
+        self.buttons = tuple(
+            KeypadButton(self, i, short_duration_ms, long_duration_ms,
+                         value_when_pressed, max_events)
+            for i in range(len(pins))
+        )
+
+    def pump(self):
+        """Move queued scanner events to their keys. Called by each button's update()."""
+        events = self._keys.events
+        ev = self._event
+        while events.get_into(ev):
+            self.buttons[ev.key_number]._queue(ev.pressed, ev.timestamp)
+
+    @property
+    def overflowed(self):
+        """True if the scanner's queue filled up and events were lost (see keypad.EventQueue)."""
+        return self._keys.events.overflowed
+
+    def deinit(self):
+        self._keys.deinit()
+
+
+class MultiDebouncer:
+    """
+    MultiDebouncer(inputs)
+
+    Debounces up to 29 inputs at once, one bit each, with vertical counters:
+    every bit has a 2-bit counter spread over two ints (bit i of _c0 / _c1),
+    so one update() is a handful of int operations however many inputs
+    there are. An input's level flips after 4 updates in a row that read the
+    other level; call update() at a steady rate (e.g. every 1 ms for 4 ms
+    of debounce).
+
+    - inputs: objects with .value (DigitalInOut), bit i for inputs[i]; or
+      the number of inputs, when the caller reads them itself and passes
+      the mask to update()
+
+    Used like Debouncer, but the flags are masks: after update(), `value`
+    has the debounced levels and `rose` / `fell` the inputs that changed
+    at this update. last_duration(i) / current_duration(i) are in seconds,
+    as for Debouncer.
+    """
+
+    def __init__(self, inputs):
+        if isinstance(inputs, int):
+            self._ios = ()
+            n = inputs
+        else:
+            self._ios = tuple(inputs)
+            n = len(self._ios)
+        if not 0 < n < 30:
+            raise ValueError("1 to 29 inputs")
+        self.count = n
+        self._mask = (1 << n) - 1
+        self._c0 = 0
+        self._c1 = 0
+        self.value = self._read() if self._ios else 0
+        self._changed = 0
+        now = ticks_ms()
+        self._changed_ticks = array("l", [now] * n)
+        self._last_duration = array("l", [0] * n)
+
+    def _read(self):
+        sample = 0
+        bit = 1
+        for io in self._ios:
+            if io.value:
+                sample |= bit
+            bit <<= 1
+        return sample
+
+    def update(self, sample=None):
+        """Take one sample of all inputs (bit i = level of input i)."""
+        if sample is None:
+            sample = self._read()
+        state = self.value
+        delta = (sample ^ state) & self._mask
+        # 计数器 3 且这次还不一样（第 4 次）→ 翻转；一样的位计数器清零
+        toggle = delta & self._c0 & self._c1
+        self._c1 = (self._c1 ^ self._c0) & delta
+        self._c0 = ~self._c0 & delta
+        self._changed = toggle
+        if not toggle:
+            return
+        self.value = state ^ toggle
+        now = ticks_ms()
+        i = 0
+        while toggle:
+            if toggle & 1:
+                self._last_duration[i] = ticks_diff(now, self._changed_ticks[i])
+                self._changed_ticks[i] = now
+            toggle >>= 1
+            i += 1
+
+    @property
+    def rose(self):
+        return self._changed & self.value
+
+    @property
+    def fell(self):
+        return self._changed & ~self.value
+
+    def last_duration(self, i):
+        """Seconds input i was stable before its most recent change."""
+        return self._last_duration[i] / 1000
+
+    def current_duration(self, i):
+        """Seconds since input i last changed."""
+        return ticks_diff(ticks_ms(), self._changed_ticks[i]) / 1000
+
+
+BUTTON_BACKENDS = ("auto", "keypad", "polled")
+
+
+def make_button(pin, *, backend="auto", **kwargs):
+    """
+    Build a debounced button on one pin with the given backend:
+
+    - "keypad": KeypadButtons scanning just this pin (needs keypad)
+    - "polled": PolledButton, sampled on every update()
+    - "auto": keypad when the port has it, otherwise polled
+
+    Other keyword arguments (value_when_pressed, debounce_ms,
+    short_duration_ms, long_duration_ms) are passed to the chosen class;
+    both backends use a pull-up.
+    """
+    if backend not in BUTTON_BACKENDS:
+        raise ValueError("backend must be one of {}".format(BUTTON_BACKENDS))
+    if backend == "keypad" or (backend == "auto" and keypad is not None):
+        return KeypadButtons((pin,), pull=True, **kwargs).buttons[0]
+    return PolledButton(pin, **kwargs)
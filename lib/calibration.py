@@ -0,0 +1,75 @@
+class BaselineEstimator:
+    """
+    BaselineEstimator(*, window=64, min_samples=20, max_var=25)
+
+    Running per-axis mean / variance of raw accelerometer counts, for
+    calibrating the "at rest" attitude in the background.
+
+    - window: samples per estimate; sums restart after each full window so
+      every intermediate stays a small int (no heap allocation per sample)
+    - min_samples: fewest samples a partial window needs to be usable
+    - max_var: largest per-axis variance (counts^2) that still counts as
+      holding the box still; noisier windows are thrown away
+
+    Feed samples with add(). result() returns (x, y, z) of the newest quiet
+    estimate, or None while there is none; settled turns True after the first
+    full quiet window, so the caller can stop sampling. reset() starts over.
+    """
+
+    def __init__(self, *, window=64, min_samples=20, max_var=25):
+        self.window = max(2, int(window))
+        self.min_samples = max(1, min(int(min_samples), self.window))
+        self.max_var = max_var
+        self.windows = 0
+        self.rejected = 0
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self._sx = self._sy = self._sz = 0
+        self._qx = self._qy = self._qz = 0
+        self._result = None
+
+    def add(self, x, y, z):
+        self._sx += x
+        self._sy += y
+        self._sz += z
+        self._qx += x * x
+        self._qy += y * y
+        self._qz += z * z
+        self.count += 1
+        if self.count >= self.window:
+            self.windows += 1
+            if self._quiet():
+                self._result = self._mean()
+            else:
+                self.rejected += 1
+            self.count = 0
+            self._sx = self._sy = self._sz = 0
+            self._qx = self._qy = self._qz = 0
+
+    def _var_ok(self, s, q):
+        # n*Σx² - (Σx)² = n² * variance，整数比较，不用除法
+        n = self.count
+        return n * q - s * s <= self.max_var * n * n
+
+    def _quiet(self):
+        return (self._var_ok(self._sx, self._qx)
+                and self._var_ok(self._sy, self._qy)
+                and self._var_ok(self._sz, self._qz))
+
+    def _mean(self):
+        n = self.count
+        half = n // 2
+        return ((self._sx + half) // n, (self._sy + half) // n, (self._sz + half) // n)
+
+    @property
+    def settled(self):
+        """True once a full quiet window has been collected."""
+        return self._result is not None
+
+    def result(self):
+        """Mean of the newest quiet window (or quiet partial window), else None."""
+        if self.count >= self.min_samples and self._quiet():
+            return self._mean()
+        return self._result
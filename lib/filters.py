@@ -0,0 +1,471 @@
+from array import array
+
+from micropython import const
+
+from fixed_motion import alpha_q8, imag3
+
+# 每个样本在流水线里是一帧：三个轴 + 一个标量通道（模长等）
+X = const(0)
+Y = const(1)
+Z = const(2)
+MAG = const(3)
+XYZ = (X, Y, Z)
+
+# DominantAxis 的方向代码：axis * 2 + (1 表示负方向)；NONE 表示没有明显方向
+DIR_NONE = const(-1)
+DIR_POS_X = const(0)
+DIR_NEG_X = const(1)
+DIR_POS_Y = const(2)
+DIR_NEG_Y = const(3)
+DIR_POS_Z = const(4)
+DIR_NEG_Z = const(5)
+DIR_NAMES = ("+X", "-X", "+Y", "-Y", "+Z", "-Z")
+
+
+def _frame():
+    return array("l", [0, 0, 0, 0])
+
+
+class Stage:
+    """
+    Base class of the filter stages.
+
+    A stage works in place on a frame: array("l") of [x, y, z, mag]. All
+    state is allocated in __init__ and the maths is integer only, so running
+    a sample through allocates nothing. Per-channel loops index the channel
+    tuple with range(), since enumerate() would put a new object on the heap
+    for every sample. Feed raw ADXL345 counts (or anything within +/-2^15).
+
+    Any stage can be used on its own with push(x, y, z) for one sample or
+    push_batch(xs, ys, zs, n) for the first n entries of three arrays (e.g.
+    an Adxl345Fifo drain); chain several with Pipeline.
+    """
+
+    def __init__(self):
+        self.frame = _frame()
+
+    def process(self, f):
+        pass
+
+    def reset(self):
+        pass
+
+    def push(self, x, y, z):
+        f = self.frame
+        f[X] = x
+        f[Y] = y
+        f[Z] = z
+        f[MAG] = 0
+        self.process(f)
+        return f
+
+    def push_batch(self, xs, ys, zs, n):
+        f = self.frame
+        for i in range(n):
+            f[X] = xs[i]
+            f[Y] = ys[i]
+            f[Z] = zs[i]
+            f[MAG] = 0
+            self.process(f)
+        return n
+
+
+class Pipeline(Stage):
+    """
+    Pipeline(*stages)
+
+    Runs each sample through the stages in order, in a single pass. A
+    Pipeline is itself a stage: nested inside another pipeline it works on a
+    copy of the frame, so it acts as a branch (e.g. one branch high-passes
+    the axes while the other takes the magnitude of the offset axes).
+    """
+
+    def __init__(self, *stages):
+        super().__init__()
+        self.stages = stages
+
+    def process(self, f):
+        own = self.frame
+        if f is not own:
+            own[X] = f[X]
+            own[Y] = f[Y]
+            own[Z] = f[Z]
+            own[MAG] = f[MAG]
+        for stage in self.stages:
+            stage.process(own)
+
+    def reset(self):
+        for stage in self.stages:
+            stage.reset()
+
+
+class Offset(Stage):
+    """Offset(x=0, y=0, z=0): subtracts a baseline from the three axes."""
+
+    def __init__(self, x=0, y=0, z=0):
+        super().__init__()
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def set(self, x, y, z):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def process(self, f):
+        f[X] -= self.x
+        f[Y] -= self.y
+        f[Z] -= self.z
+
+
+class Magnitude(Stage):
+    """Writes |(x, y, z)| into the MAG channel, in 1/16 count (see fixed_motion.imag3)."""
+
+    def process(self, f):
+        f[MAG] = imag3(f[X], f[Y], f[Z])
+
+
+class Ema(Stage):
+    """
+    Ema(alpha, *, channels=XYZ)
+
+    First-order low-pass, y += alpha * (x - y), on each listed channel.
+    The state keeps 8 extra fraction bits so small steps do not get lost.
+    """
+
+    def __init__(self, alpha, *, channels=XYZ):
+        super().__init__()
+        self.alpha = alpha_q8(alpha)
+        self.channels = tuple(channels)
+        self._state = array("l", [0] * len(self.channels))
+
+    def reset(self):
+        for i in range(len(self._state)):
+            self._state[i] = 0
+
+    def process(self, f):
+        a = self.alpha
+        state = self._state
+        chs = self.channels
+        for i in range(len(chs)):
+            ch = chs[i]
+            s = state[i]
+            s += (a * ((f[ch] << 8) - s)) >> 8
+            state[i] = s
+            f[ch] = s >> 8
+
+
+class HighPass(Stage):
+    """
+    HighPass(alpha, *, channels=XYZ)
+
+    First-order IIR high-pass, y = alpha * (y + x - x_prev), as in
+    "highpass filtering.py": gravity and slow tilts drop out, quick changes
+    pass. The first sample after reset() only primes x_prev.
+    """
+
+    def __init__(self, alpha, *, channels=XYZ):
+        super().__init__()
+        self.alpha = alpha_q8(alpha)
+        self.channels = tuple(channels)
+        n = len(self.channels)
+        self._prev = array("l", [0] * n)
+        self._state = array("l", [0] * n)
+        self._primed = False
+
+    def reset(self):
+        for i in range(len(self._state)):
+            self._prev[i] = 0
+            self._state[i] = 0
+        self._primed = False
+
+    def process(self, f):
+        a = self.alpha
+        prev = self._prev
+        state = self._state
+        primed = self._primed
+        chs = self.channels
+        for i in range(len(chs)):
+            ch = chs[i]
+            x = f[ch]
+            if primed:
+                s = (a * (state[i] + ((x - prev[i]) << 8))) >> 8
+            else:
+                s = 0
+            prev[i] = x
+            state[i] = s
+            f[ch] = s >> 8
+        self._primed = True
+
+
+class Peak(Stage):
+    """Peak(channel=MAG): remembers the largest value seen since reset()."""
+
+    def __init__(self, channel=MAG):
+        super().__init__()
+        self.channel = channel
+        self.value = 0
+
+    def reset(self):
+        self.value = 0
+
+    def process(self, f):
+        v = f[self.channel]
+        if v > self.value:
+            self.value = v
+
+
+class Gate(Stage):
+    """
+    Gate(on, off=None, *, channel=MAG, count=1)
+
+    Hysteresis + debounce on one channel, like the consecutive-count motion
+    check in motion.py: active turns on after `count` samples in a row above
+    `on`, and off after `count` samples in a row below `off` (default: on).
+    Each turn-on also sets `triggered` until take() reads it, so an edge
+    inside a batch is not missed.
+    """
+
+    def __init__(self, on, off=None, *, channel=MAG, count=1):
+        super().__init__()
+        self.on = on
+        self.off = on if off is None else off
+        self.channel = channel
+        self.count = max(1, int(count))
+        self.reset()
+
+    def reset(self):
+        self.active = False
+        self.triggered = False
+        self._run = 0
+
+    def take(self):
+        hit = self.triggered
+        self.triggered = False
+        return hit
+
+    def process(self, f):
+        v = f[self.channel]
+        if self.active:
+            flip = v < self.off
+        else:
+            flip = v > self.on
+        if not flip:
+            self._run = 0
+            return
+        self._run += 1
+        if self._run >= self.count:
+            self._run = 0
+            self.active = not self.active
+            if self.active:
+                self.triggered = True
+
+
+class DominantAxis(Stage):
+    """
+    DominantAxis(threshold, *, count=4, channels=XYZ)
+
+    The axis with the largest |value|, as in accelerometer.py. A direction
+    (DIR_* code) is confirmed once the same axis and sign win `count`
+    samples in a row with |value| > threshold; `direction` holds the
+    confirmed direction (DIR_NONE when there is none) and `triggered` is set
+    each time a new one is confirmed, until take() reads it. `confirmed`
+    keeps the direction of that last confirmation: a later sample in the
+    same batch may already have dropped `direction` back to DIR_NONE.
+    """
+
+    def __init__(self, threshold, *, count=4, channels=XYZ):
+        super().__init__()
+        self.threshold = threshold
+        self.count = max(1, int(count))
+        self.channels = tuple(channels)
+        self.reset()
+
+    def reset(self):
+        self.direction = DIR_NONE
+        self.confirmed = DIR_NONE
+        self.triggered = False
+        self._candidate = DIR_NONE
+        self._run = 0
+
+    def take(self):
+        hit = self.triggered
+        self.triggered = False
+        return hit
+
+    def process(self, f):
+        best = DIR_NONE
+        best_abs = self.threshold
+        for ch in self.channels:
+            v = f[ch]
+            if v > best_abs:
+                best = ch * 2
+                best_abs = v
+            elif -v > best_abs:
+                best = ch * 2 + 1
+                best_abs = -v
+
+        if best == DIR_NONE:
+            self._candidate = DIR_NONE
+            self._run = 0
+            self.direction = DIR_NONE
+            return
+        if best != self._candidate:
+            self._candidate = best
+            self._run = 0
+        self._run += 1
+        if self._run == self.count and best != self.direction:
+            self.direction = best
+            self.confirmed = best
+            self.triggered = True
+
+
+class WindowVariance(Stage):
+    """
+    WindowVariance(window, max_var, *, channels=XYZ)
+
+    Variance over the last `window` samples, summed over the listed
+    channels. The window must be 2..64 samples (ValueError otherwise): the
+    sums would leave small-int range beyond 64. The samples sit in a preallocated ring buffer and the running
+    sum / sum of squares are updated as each one enters and the oldest
+    leaves, so a sample costs the same whatever the window.
+
+    `still` is True while the window is full and the summed variance is at
+    most max_var (counts^2); `triggered` is set each time it turns True,
+    until take() reads it. Values are clamped to +/-511 (2 g) so that
+    n * sum(x^2) stays a small int; anything that large is not still anyway.
+    """
+
+    def __init__(self, window, max_var, *, channels=XYZ):
+        super().__init__()
+        if not 2 <= window <= 64:
+            raise ValueError("window must be 2 to 64 samples")
+        self.window = int(window)
+        self.max_var = max_var
+        self.channels = tuple(channels)
+        n = len(self.channels)
+        self._buf = array("h", [0] * (n * self.window))
+        self._sum = array("l", [0] * n)
+        self._sq = array("l", [0] * n)
+        self.reset()
+
+    def reset(self):
+        for i in range(len(self._sum)):
+            self._sum[i] = 0
+            self._sq[i] = 0
+        self._pos = 0
+        self.count = 0
+        self.still = False
+        self.triggered = False
+
+    def take(self):
+        hit = self.triggered
+        self.triggered = False
+        return hit
+
+    def process(self, f):
+        w = self.window
+        buf = self._buf
+        sums = self._sum
+        sqs = self._sq
+        pos = self._pos
+        full = self.count >= w
+        spread = 0
+        chs = self.channels
+        for i in range(len(chs)):
+            v = f[chs[i]]
+            if v > 511:
+                v = 511
+            elif v < -511:
+                v = -511
+            j = i * w + pos
+            s = sums[i] + v
+            q = sqs[i] + v * v
+            if full:
+                old = buf[j]
+                s -= old
+                q -= old * old
+            buf[j] = v
+            sums[i] = s
+            sqs[i] = q
+            spread += w * q - s * s
+        self._pos = pos + 1 if pos + 1 < w else 0
+        if not full:
+            self.count += 1
+            if self.count < w:
+                return
+
+        # n*Σx² - (Σx)² = n² * variance，和 calibration 里一样不用除法
+        still = spread <= self.max_var * w * w
+        if still and not self.still:
+            self.triggered = True
+        self.still = still
+
+
+class Reversals(Stage):
+    """
+    Reversals(threshold, *, count=4, window=50, channels=XYZ)
+
+    Counts swings that change direction: a channel reverses when it goes from
+    above +threshold to below -threshold or back; values in between keep the
+    side they were on, so noise around zero never counts. `triggered` is set
+    when `count` reversals (over all listed channels) fall within `window`
+    samples, until take() reads it; the count then starts over.
+
+    Feed it high-passed axes (HighPass in a branch): gravity and slow tilts
+    never swing both ways, so they drop out whatever the box's attitude.
+    """
+
+    def __init__(self, threshold, *, count=4, window=50, channels=XYZ):
+        super().__init__()
+        self.threshold = threshold
+        self.count = max(1, int(count))
+        self.window = max(1, int(window))
+        self.channels = tuple(channels)
+        self._side = array("b", [0] * len(self.channels))
+        self._times = array("l", [0] * self.count)
+        self.reset()
+
+    def reset(self):
+        for i in range(len(self._side)):
+            self._side[i] = 0
+        self._pos = 0
+        self._seen = 0
+        self._n = 0
+        self.triggered = False
+
+    def take(self):
+        hit = self.triggered
+        self.triggered = False
+        return hit
+
+    def process(self, f):
+        self._n += 1
+        t = self.threshold
+        sides = self._side
+        chs = self.channels
+        for i in range(len(chs)):
+            v = f[chs[i]]
+            if v > t:
+                side = 1
+            elif v < -t:
+                side = -1
+            else:
+                continue
+            was = sides[i]
+            sides[i] = side
+            if was == 0 or was == side:
+                continue
+
+            # 环形缓冲里留最近 count 次反向的样本号，最老的那个就在下一个写入位置
+            pos = self._pos
+            self._times[pos] = self._n
+            pos += 1
+            if pos >= self.count:
+                pos = 0
+            self._pos = pos
+            self._seen += 1
+            if self._seen >= self.count and self._n - self._times[pos] < self.window:
+                self.triggered = True
+                self._seen = 0
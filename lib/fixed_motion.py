@@ -0,0 +1,44 @@
+from micropython import const
+
+MAG_FRAC_BITS = const(4)       # imag3() 的结果是 1/16 count
+_MAX_SQ = const((1 << 22) - 1)  # 再大就超出 small int（2^30）了，约 78 m/s^2
+_MAG_LIMIT = const((1 << (11 + MAG_FRAC_BITS)) - 1)   # 饱和值 ≈ sqrt(_MAX_SQ)
+
+
+def alpha_q8(alpha):
+    return max(1, min(256, int(alpha * 256 + 0.5)))
+
+
+def imag3(dx, dy, dz):
+    """
+    Integer |(dx, dy, dz)| in 1/16 count, without math.sqrt.
+
+    Starts from an alpha-max-beta-min estimate (within ~8%) and refines it
+    with two integer Newton steps, which leaves well under 0.1% error. Every
+    intermediate fits in a small int, so nothing is allocated on the heap.
+    """
+    if dx < 0:
+        dx = -dx
+    if dy < 0:
+        dy = -dy
+    if dz < 0:
+        dz = -dz
+    sq = dx * dx + dy * dy + dz * dz
+    if sq == 0:
+        return 0
+    if sq > _MAX_SQ:
+        return _MAG_LIMIT
+    n = sq << (2 * MAG_FRAC_BITS)
+
+    # 排序出 max / mid / min，估计值 ≈ max + 13/32 mid + 10/32 min（再乘 0.944）
+    if dx < dy:
+        dx, dy = dy, dx
+    if dy < dz:
+        dy, dz = dz, dy
+        if dx < dy:
+            dx, dy = dy, dx
+    m = ((dx << 5) + 13 * dy + 10 * dz) * 15 >> 5     # 15/16 ≈ 0.944，仍是 <<4 的定点
+    m = (m + n // m) >> 1
+    m = (m + n // m) >> 1
+    return m
+
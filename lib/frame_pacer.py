@@ -0,0 +1,93 @@
+from ticks import ticks_ms, ticks_add, ticks_diff
+
+
+class FramePacer:
+    """
+    FramePacer(display, *, fps=25, bus=None)
+
+    Manual-refresh render stage for a displayio display.
+
+    - display: a displayio display (e.g. adafruit_displayio_ssd1306.SSD1306);
+      auto_refresh is switched off so label changes no longer push pixels by
+      themselves
+    - fps: target frame rate, independent of how fast the main loop runs
+    - bus: optional BusClient (bus_scheduler); a due refresh first asks it
+      may_start() with the last refresh time (ms) as the cost, and waits
+      while the answer is no
+
+    Call mark_dirty() whenever something on screen changes and update() once per
+    loop iteration, after the state machine. All changes made in between are
+    sent in one display.refresh(), at most fps times per second. `now` is a
+    ticks.ticks_ms() value and the frame period is kept in whole ms.
+
+    frames / late / dropped count refreshes, refreshes that started more than one
+    period after they were due, and whole frame periods that were skipped.
+    Refreshes held back by the bus are counted by the scheduler.
+    """
+
+    def __init__(self, display, *, fps=25, bus=None):
+        self._display = display
+        self._bus = bus
+        display.auto_refresh = False
+        self._period = max(1, 1000 // max(1, fps))
+        self._next_due = ticks_ms()
+        self._dirty = True
+        self.frames = 0
+        self.late = 0
+        self.dropped = 0
+        self.max_refresh_ms = 0
+        self.last_refresh_ms = 0
+
+    @property
+    def fps(self):
+        return 1000 / self._period
+
+    @fps.setter
+    def fps(self, value):
+        self._period = max(1, 1000 // max(1, value))
+
+    def mark_dirty(self):
+        self._dirty = True
+
+    def update(self, now=None):
+        """Refresh the display if something changed and a frame is due. Returns True if it refreshed."""
+        if now is None:
+            now = ticks_ms()
+        lateness = ticks_diff(now, self._next_due)
+        if lateness < 0:
+            return False
+        if not self._dirty:
+            # 空闲时把节拍拖到现在，内容一变下一次循环就能画，也不会被误算成迟到
+            self._next_due = now
+            return False
+
+        bus = self._bus
+        if bus is not None and not bus.may_start(now, self.last_refresh_ms):
+            return False
+
+        if self.frames and lateness > self._period:
+            self.late += 1
+            self.dropped += lateness // self._period
+
+        self._dirty = False
+        if bus is not None:
+            bus.begin()
+        start = ticks_ms()
+        self._display.refresh()
+        took = ticks_diff(ticks_ms(), start)
+        if bus is not None:
+            bus.end()
+        self.last_refresh_ms = took
+        if took > self.max_refresh_ms:
+            self.max_refresh_ms = took
+        self.frames += 1
+
+        # 按节拍排下一帧；落后太多就从现在重新对齐，避免连续补帧
+        self._next_due = ticks_add(self._next_due, self._period)
+        if ticks_diff(self._next_due, now) <= 0:
+            self._next_due = ticks_add(now, self._period)
+        return True
+
+    def report(self, out=print):
+        out("display: {} frames @ {:.0f} fps target, {} late, {} dropped, max refresh {} ms".format(
+            self.frames, self.fps, self.late, self.dropped, self.max_refresh_ms))
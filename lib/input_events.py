@@ -0,0 +1,149 @@
+from array import array
+
+from ticks import ticks_ms
+
+# 事件类型
+EV_NONE = 0
+EV_DIAL_CW = 1      # DIAL+
+EV_DIAL_CCW = 2     # DIAL-
+EV_PRESS = 3
+EV_RELEASE = 4
+EV_SHAKE = 5
+EV_STILL = 6
+EV_TILT = 7         # value = 方向代码（filters.DIR_*）
+EV_TAP = 8          # ADXL345 双击
+EV_LONG_PRESS = 9   # 按住超过 long_press_ms（还没松手）
+EV_MULTI_CLICK = 10 # value = 连按次数（2 = 双击）
+EV_CLICK = 11       # 松手，而且这一下没有变成长按
+EVENT_NAMES = (
+    "NONE", "DIAL+", "DIAL-", "PRESS", "RELEASE", "SHAKE", "STILL", "TILT", "TAP",
+    "LONG", "CLICKS", "CLICK",
+)
+
+
+class EventQueue:
+    """
+    EventQueue(size=32)
+
+    Bounded ring buffer of timestamped input events, allocated up front.
+
+    push() adds (type, time, value), the time being a ticks.ticks_ms() value;
+    when the buffer is full the oldest event is dropped and counted in
+    `dropped`. pop() returns the next event type, or EV_NONE when empty, and
+    leaves its time / value in `last_time` / `last_value` so no tuple is
+    allocated per event.
+    """
+
+    def __init__(self, size=32):
+        self._size = max(2, int(size))
+        self._types = bytearray(self._size)
+        self._times = array("l", [0] * self._size)
+        self._values = array("h", [0] * self._size)
+        self._head = 0
+        self._count = 0
+        self.dropped = 0
+        self.last_time = 0
+        self.last_value = 0
+
+    def __len__(self):
+        return self._count
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+
+    def push(self, ev_type, t, value=0):
+        if self._count == self._size:
+            self._head = (self._head + 1) % self._size
+            self._count -= 1
+            self.dropped += 1
+        i = (self._head + self._count) % self._size
+        self._types[i] = ev_type
+        self._times[i] = t
+        self._values[i] = value
+        self._count += 1
+
+    def pop(self):
+        if self._count == 0:
+            return EV_NONE
+        i = self._head
+        self._head = (i + 1) % self._size
+        self._count -= 1
+        self.last_time = self._times[i]
+        self.last_value = self._values[i]
+        return self._types[i]
+
+
+class InputEvents(EventQueue):
+    """
+    InputEvents(encoder, button, *, size=32)
+
+    Turns the rotary encoder and the push button into one queue of events
+    for the state machine to drain; motion detectors push() their SHAKE /
+    STILL / TILT / TAP events into the same queue.
+
+    - encoder: RotaryEncoder / HardwareRotaryEncoder; each detent becomes a
+      DIAL+ or DIAL- event
+    - button: a debounced button with the adafruit_debouncer.Button
+      interface (buttons.make_button: PolledButton or KeypadButton); its
+      pressed / released edges become PRESS / RELEASE, a long_press gives
+      LONG_PRESS (while still held), a release after a press that did not
+      become a long press gives CLICK (so a hold never counts as a click),
+      and a short_count of 2 or more gives MULTI_CLICK with the count as
+      value once the series ends (every press still gives its own PRESS /
+      CLICK)
+    """
+
+    def __init__(self, encoder, button, *, size=32):
+        super().__init__(size)
+        self._encoder = encoder
+        self.button = button
+        self._held_long = False   # 这次按下已经报过 LONG_PRESS，松手不算 CLICK
+
+    def poll_encoder(self, now):
+        if not self._encoder.update():
+            return
+        delta = self._encoder.get_delta()
+        ev = EV_DIAL_CW if delta > 0 else EV_DIAL_CCW
+        for _ in range(abs(delta)):
+            self.push(ev, now, 1)
+
+    def poll_button(self, now):
+        btn = self.button
+        btn.update()
+        if btn.pressed:
+            self.push(EV_PRESS, now)
+        elif btn.released:
+            self.push(EV_RELEASE, now)
+            if self._held_long:
+                self._held_long = False
+            else:
+                self.push(EV_CLICK, now)
+        if btn.long_press:
+            self._held_long = True
+            self.push(EV_LONG_PRESS, now)
+        if btn.short_count > 1:
+            self.push(EV_MULTI_CLICK, now, btn.short_count)
+
+    def poll(self, now=None):
+        if now is None:
+            now = ticks_ms()
+        self.poll_encoder(now)
+        self.poll_button(now)
+
+    def drop_motion(self):
+        """Remove queued SHAKE / STILL / TILT / TAP events, keeping the rest in order."""
+        size = self._size
+        types = self._types
+        src = dst = self._head
+        kept = 0
+        for _ in range(self._count):
+            ev = types[src]
+            if not EV_SHAKE <= ev <= EV_TAP:
+                types[dst] = ev
+                self._times[dst] = self._times[src]
+                self._values[dst] = self._values[src]
+                dst = (dst + 1) % size
+                kept += 1
+            src = (src + 1) % size
+        self._count = kept
@@ -0,0 +1,133 @@
+import sys
+import time
+from array import array
+
+try:
+    import supervisor
+except ImportError:
+    supervisor = None
+
+# 可选的分段名字，顺序即 span id
+SPAN_AUDIO = 0
+SPAN_ENCODER = 1
+SPAN_BUTTON = 2
+SPAN_RENDER = 3
+SPAN_ACCEL = 4
+SPAN_LOGIC = 5
+SPAN_DISPLAY = 6
+SPAN_NAMES = ("audio", "encoder", "button", "render", "accel", "logic", "display")
+
+
+class LoopProfiler:
+    """
+    LoopProfiler(state_names, *, span_names=SPAN_NAMES, bucket_us=DEFAULT_BUCKETS_US)
+
+    Fixed-size latency histograms for the main loop.
+
+    - state_names: names indexed by the integer state value (STATE_* constants)
+    - span_names: names indexed by span id, for the optional per-span timings
+    - bucket_us: ascending upper edges of the histogram buckets in microseconds;
+      one extra bucket collects everything above the last edge
+
+    Call begin() at the top of an iteration, span(id) after each stage you want
+    timed (it records the time since the previous mark) and end(state) before the
+    loop sleeps. All storage is allocated up front. Other components can add
+    their own lines to dump() with add_reporter(fn), where fn(out) prints.
+    """
+
+    DEFAULT_BUCKETS_US = (250, 500, 1000, 2000, 5000, 10000, 20000, 50000, 100000)
+
+    def __init__(self, state_names, *, span_names=SPAN_NAMES, bucket_us=DEFAULT_BUCKETS_US):
+        self._edges = tuple(bucket_us)
+        self._state_names = tuple(state_names)
+        self._span_names = tuple(span_names)
+        nbuckets = len(self._edges) + 1
+        self._state_hist = [array("L", [0] * nbuckets) for _ in self._state_names]
+        self._span_hist = [array("L", [0] * nbuckets) for _ in self._span_names]
+        self._state_max = array("L", [0] * len(self._state_names))
+        self._span_max = array("L", [0] * len(self._span_names))
+        self._state_total = [0] * len(self._state_names)
+        self._span_total = [0] * len(self._span_names)
+        self._t0 = 0
+        self._last = 0
+        self._reporters = []
+
+    def add_reporter(self, fn):
+        self._reporters.append(fn)
+
+    def _bucket(self, us):
+        i = 0
+        for edge in self._edges:
+            if us < edge:
+                return i
+            i += 1
+        return i
+
+    def begin(self):
+        self._t0 = self._last = time.monotonic_ns()
+
+    def span(self, span_id):
+        now = time.monotonic_ns()
+        us = (now - self._last) // 1000
+        self._last = now
+        self._span_hist[span_id][self._bucket(us)] += 1
+        self._span_total[span_id] += us
+        if us > self._span_max[span_id]:
+            self._span_max[span_id] = us
+
+    def end(self, state):
+        us = (time.monotonic_ns() - self._t0) // 1000
+        self._state_hist[state][self._bucket(us)] += 1
+        self._state_total[state] += us
+        if us > self._state_max[state]:
+            self._state_max[state] = us
+
+    def reset(self):
+        for hist in self._state_hist + self._span_hist:
+            for i in range(len(hist)):
+                hist[i] = 0
+        for i in range(len(self._state_names)):
+            self._state_max[i] = 0
+            self._state_total[i] = 0
+        for i in range(len(self._span_names)):
+            self._span_max[i] = 0
+            self._span_total[i] = 0
+
+    def _dump_rows(self, title, names, hists, totals, maxes, out):
+        out("{:<12}{:>7}{:>8}{:>8}  ".format(title, "n", "mean", "max")
+            + " ".join("<{:<5}".format(self._fmt_us(e)) for e in self._edges)
+            + " >={}".format(self._fmt_us(self._edges[-1])))
+        for i, name in enumerate(names):
+            n = sum(hists[i])
+            if n == 0:
+                continue
+            out("{:<12}{:>7}{:>8}{:>8}  ".format(name, n, totals[i] // n, maxes[i])
+                + " ".join("{:>6}".format(c) for c in hists[i]))
+
+    @staticmethod
+    def _fmt_us(us):
+        if us >= 1000:
+            return "{}ms".format(us // 1000)
+        return "{}us".format(us)
+
+    def dump(self, out=print):
+        """Print the histograms (microseconds) over serial."""
+        out("--- loop profile (us) ---")
+        self._dump_rows("state", self._state_names, self._state_hist,
+                        self._state_total, self._state_max, out)
+        if any(sum(h) for h in self._span_hist):
+            self._dump_rows("span", self._span_names, self._span_hist,
+                            self._span_total, self._span_max, out)
+        for fn in self._reporters:
+            fn(out)
+
+    def poll_serial(self):
+        """Handle one console command: 'p' prints the histograms, 'r' resets them."""
+        if supervisor is None or not supervisor.runtime.serial_bytes_available:
+            return
+        cmd = sys.stdin.read(1)
+        if cmd in ("p", "P"):
+            self.dump()
+        elif cmd in ("r", "R"):
+            self.reset()
+            print("profile reset")
@@ -22,6 +22,7 @@ baseline = baseline_sum / baseline_samples
 print(f"Baseline magnitude: {baseline:.3f}")
 
 threshold = baseline + 0.8
+threshold_sq = threshold * threshold   # 循环里比较平方，省掉每次的 sqrt
 required_count = 5
 
 motion_count = 0
@@ -31,9 +32,9 @@ print("Start monitoring motion...")
 
 while True:
     x, y, z = accelerometer.acceleration
-    mag = math.sqrt(x * x + y * y + z * z)
+    mag_sq = x * x + y * y + z * z
 
-    if mag >= threshold:
+    if mag_sq >= threshold_sq:
         motion_count += 1
     else:
         motion_count = 0
@@ -44,9 +45,9 @@ while True:
         motion_detected = True
 
     print(
-        f"Mag: {mag:.3f}  "
+        f"Mag^2: {mag_sq:.3f}  "
         f"Baseline: {baseline:.3f}  "
-        f"Threshold: {threshold:.3f}  "
+        f"Threshold^2: {threshold_sq:.3f}  "
         f"Count: {motion_count}"
     )
 
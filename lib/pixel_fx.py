@@ -0,0 +1,150 @@
+import math
+
+from ticks import ticks_ms, ticks_add, ticks_diff
+
+
+class PixelAnimator:
+    """
+    PixelAnimator(pixels, *, fps=50, breathe_steps=32)
+
+    Non-blocking effect engine for a NeoPixel strip (all pixels show one color).
+
+    - pixels: a neopixel.NeoPixel, ideally created with auto_write=False
+    - fps: frame budget; update() renders at most this many times per second
+    - breathe_steps: size of the precomputed breathing brightness table
+
+    Effects (solid / flash / breathe / fade) are scheduled against
+    ticks.ticks_ms(); their times are given in seconds and turned into whole
+    ms when the effect starts. update() must be called once per main loop
+    iteration; the strip is only written when the computed color differs
+    from the last one.
+    """
+
+    EFFECT_SOLID = 0
+    EFFECT_FLASH = 1
+    EFFECT_BREATHE = 2
+    EFFECT_FADE = 3
+
+    OFF = (0, 0, 0)
+
+    def __init__(self, pixels, *, fps=50, breathe_steps=32):
+        self._pixels = pixels
+        self._frame_period = max(1, 1000 // max(1, fps))
+        self._next_frame = ticks_ms()
+        self._shown = None            # 最后一次真正写到灯珠上的颜色
+
+        # 呼吸灯亮度表：0.2~1.0，只在初始化时算一次 sin
+        self._breathe_steps = max(4, int(breathe_steps))
+        self._breathe_scale = [
+            0.2 + 0.8 * (math.sin(2 * math.pi * i / self._breathe_steps) + 1.0) * 0.5
+            for i in range(self._breathe_steps)
+        ]
+        self._breathe_colors = [self.OFF] * self._breathe_steps
+
+        self._effect = self.EFFECT_SOLID
+        self._color = self.OFF
+        self._then = self.OFF
+        self._from = self.OFF
+        self._start = self._next_frame
+        self._period = 1
+        self._times = 0
+
+    def _restart(self, effect, color):
+        self._effect = effect
+        self._color = color
+        self._start = ticks_ms()
+        self._next_frame = self._start    # 下一次 update() 立刻渲染
+
+    def solid(self, color):
+        """Show one color until another effect is started."""
+        if self._effect == self.EFFECT_SOLID and self._color == color:
+            return
+        self._restart(self.EFFECT_SOLID, color)
+
+    def off(self):
+        self.solid(self.OFF)
+
+    def flash(self, color, times=3, delay=0.1, then=OFF):
+        """Blink color on/off `times` times, `delay` seconds per half period, then show `then`."""
+        self._times = max(1, int(times))
+        self._period = max(1, int(delay * 1000 + 0.5))
+        self._then = then
+        self._restart(self.EFFECT_FLASH, color)
+
+    def breathe(self, color, speed=2.0):
+        """Loop the brightness of color between 20% and 100%; speed is in rad/s like math.sin(t * speed)."""
+        if self._effect == self.EFFECT_BREATHE and self._color == color:
+            return
+        r, g, b = color
+        for i, scale in enumerate(self._breathe_scale):
+            self._breathe_colors[i] = (int(r * scale), int(g * scale), int(b * scale))
+        # 一个呼吸周期 2π/speed 秒，分成 breathe_steps 份
+        self._period = max(1, int(2000 * math.pi / max(0.001, speed) / self._breathe_steps + 0.5))
+        self._restart(self.EFFECT_BREATHE, color)
+
+    def fade(self, color, duration=0.3):
+        """Linearly fade from the color currently shown to `color`."""
+        if self._color == color and self._effect in (self.EFFECT_SOLID, self.EFFECT_FADE):
+            return
+        self._from = self._shown if self._shown is not None else self.OFF
+        self._period = max(1, int(duration * 1000 + 0.5))
+        self._restart(self.EFFECT_FADE, color)
+
+    @property
+    def busy(self):
+        """True while a finite effect (flash / fade) is still running."""
+        return self._effect in (self.EFFECT_FLASH, self.EFFECT_FADE)
+
+    def _write(self, color):
+        if color == self._shown:
+            return
+        self._shown = color
+        self._pixels.fill(color)
+        if not self._pixels.auto_write:
+            self._pixels.show()
+
+    def update(self, now=None):
+        """Render one frame if the frame budget allows it."""
+        if now is None:
+            now = ticks_ms()
+        if ticks_diff(now, self._next_frame) < 0:
+            return
+        self._next_frame = ticks_add(now, self._frame_period)
+
+        effect = self._effect
+        if effect == self.EFFECT_SOLID:
+            self._write(self._color)
+            return
+
+        elapsed = ticks_diff(now, self._start)
+        if effect == self.EFFECT_BREATHE:
+            step = elapsed // self._period
+            if step >= self._breathe_steps:
+                # 呼吸一直循环：起点跟着整周期前移，elapsed 永远不会大到绕回
+                loops = step // self._breathe_steps
+                self._start = ticks_add(self._start, loops * self._breathe_steps * self._period)
+                step -= loops * self._breathe_steps
+            self._write(self._breathe_colors[step])
+
+        elif effect == self.EFFECT_FLASH:
+            half = elapsed // self._period
+            if half >= 2 * self._times:
+                self._effect = self.EFFECT_SOLID
+                self._color = self._then
+                self._write(self._then)
+            else:
+                self._write(self.OFF if half & 1 else self._color)
+
+        elif effect == self.EFFECT_FADE:
+            if elapsed >= self._period:
+                self._effect = self.EFFECT_SOLID
+                self._write(self._color)
+            else:
+                r0, g0, b0 = self._from
+                r1, g1, b1 = self._color
+                p = self._period
+                self._write((
+                    r0 + (r1 - r0) * elapsed // p,
+                    g0 + (g1 - g0) * elapsed // p,
+                    b0 + (b1 - b0) * elapsed // p,
+                ))
@@ -1,27 +1,44 @@
-import time
+from array import array
+
 import digitalio
+from micropython import const
+
+from ticks import ticks_ms, ticks_diff
+
+try:
+    import rotaryio
+except ImportError:
+    rotaryio = None   # not every port has it (e.g. the ESP32-C3 has no PCNT unit)
+
+# 16 项解码表，下标 = prev_q << 2 | curr_q（q = A << 1 | B）。
+# 格雷码一格：+1 = 00→01→11→10→00，-1 反过来；没变是 0；
+# 两个脚同时变（00↔11、01↔10）中间丢了边沿，方向不知道，记成 _ILLEGAL
+_ILLEGAL = const(2)
+_DECODE = array("b", (
+    0, 1, -1, _ILLEGAL,
+    -1, 0, _ILLEGAL, 1,
+    1, _ILLEGAL, 0, -1,
+    _ILLEGAL, -1, 1, 0,
+))
+
 
 class RotaryEncoder:
     """
     RotaryEncoder(pin_a, pin_b, *, pull=digitalio.Pull.UP, debounce_ms=3, pulses_per_detent=4)
 
     - pin_a, pin_b: board pin objects (e.g. board.D1, board.D0)
-    - debounce_ms: stable time (ms) before accepting a new state 
+    - debounce_ms: stable time (ms) before accepting a new state, timed on
+      ticks.ticks_ms() so it stays exact however long the board has been up
     - pulses_per_detent: number of encoder edges per visible detent. Set to 1 if you want
       raw edges, or to 4 for many encoders so 1 detent == 1 step.
-    """
 
-    # Quadrature Table
-    _TRANSITIONS = {
-        0b0001:  1,  
-        0b0011:  1,  
-        0b0111:  1,  
-        0b0100: -1,  
-        0b1110:  1,  
-        0b1101: -1,  
-        0b1000:  1,  
-        0b1011: -1,  
-        }
+    Each accepted state change is decoded with one lookup in a 16-entry
+    table. Counters for report(): steps, the valid +/-1 edges; illegal,
+    changes where both pins flipped at once because a state was missed
+    between two updates (counted as two edges in the direction of the last
+    valid step, since a knob seldom reverses inside a detent); glitches,
+    pin changes that went back before debounce_ms was up.
+    """
 
     def __init__(self, pin_a, pin_b, *, pull=digitalio.Pull.UP, debounce_ms=3, pulses_per_detent=3):
         self._a = digitalio.DigitalInOut(pin_a)
@@ -32,61 +49,53 @@ class RotaryEncoder:
         self._debounce_ms = max(1, int(debounce_ms))
         self._pulses_per_detent = max(1, int(pulses_per_detent))
 
-        self._last_raw = (self._a.value, self._b.value)
-        self._last_stable = self._last_raw
-        self._last_change_time = time.monotonic() * 1000.0 
-
-        self._last_q = (1 if self._last_stable[0] else 0) << 1 | (1 if self._last_stable[1] else 0)
+        self._last_raw = self._read_raw()
+        self._last_q = self._last_raw      # 最后一个去抖后接受的状态
+        self._last_change_time = ticks_ms()
+        self._direction = 0                # 上一个合法步的方向，补跳过的状态用
 
         self._position_raw = 0
         self._position = 0
         self._delta_accum = 0
 
-    @staticmethod
-    def _pack(state):
-        
-        return (1 if state[0] else 0) << 1 | (1 if state[1] else 0)
+        self.steps = 0
+        self.illegal = 0
+        self.glitches = 0
 
     def _read_raw(self):
-        return (self._a.value, self._b.value)
+        return (2 if self._a.value else 0) | (1 if self._b.value else 0)
 
     def update(self):
-        now = time.monotonic() * 1000.0
+        now = ticks_ms()
         raw = self._read_raw()
         if raw != self._last_raw:
-            
+            if raw == self._last_q:
+                # 还没稳定就弹回原来的状态：被去抖挡掉的毛刺
+                self.glitches += 1
             self._last_raw = raw
             self._last_change_time = now
             return False
 
-        if raw != self._last_stable and (now - self._last_change_time) >= self._debounce_ms:
-            prev_q = self._last_q
-            self._last_stable = raw
-            curr_q = self._pack(raw)
-            self._last_q = curr_q
-
-            key = (prev_q << 2) | curr_q
-            move = self._TRANSITIONS.get(key, 0)
-
- 
-            if move == 0:
-                diff = (curr_q - prev_q) % 4
-                if diff == 1:
-                    move = 1
-                elif diff == 3:
-                    move = -1
-                elif diff == 2:
-                    move = 2 if ( (curr_q - prev_q) > 0 ) else -2
-
-            if move != 0:
-                self._position_raw += int(move)
-
-                new_pos = self._position_raw // self._pulses_per_detent
-                if new_pos != self._position:
-                    delta = new_pos - self._position
-                    self._position = new_pos
-                    self._delta_accum += delta
-                    return True
+        if raw == self._last_q or ticks_diff(now, self._last_change_time) < self._debounce_ms:
+            return False
+
+        move = _DECODE[(self._last_q << 2) | raw]
+        self._last_q = raw
+        if move == _ILLEGAL:
+            # 中间那个状态没读到（循环一次比一格还慢）：记一次，按上一步的方向补两步
+            self.illegal += 1
+            move = 2 * self._direction
+        else:
+            self.steps += 1
+            self._direction = move
+        self._position_raw += move
+
+        new_pos = self._position_raw // self._pulses_per_detent
+        if new_pos != self._position:
+            delta = new_pos - self._position
+            self._position = new_pos
+            self._delta_accum += delta
+            return True
         return False
 
     @property
@@ -111,4 +120,94 @@ class RotaryEncoder:
             self._position_raw = self._position * self._pulses_per_detent
         self._delta_accum = 0
 
-    
+    def report(self, out=print):
+        out("encoder: {} steps, {} illegal, {} glitches, position {} ({} raw)".format(
+            self.steps, self.illegal, self.glitches, self._position, self._position_raw))
+
+
+class HardwareRotaryEncoder:
+    """
+    HardwareRotaryEncoder(pin_a, pin_b, *, pulses_per_detent=3, **ignored)
+
+    Same interface as RotaryEncoder (position / position_raw / update() /
+    get_delta() / reset() / report()), but the edges are counted by the port's
+    rotaryio.IncrementalEncoder in the background, so no step is lost while the
+    main loop is busy and update() is O(1).
+
+    - pulses_per_detent: raw counts per visible detent, as for RotaryEncoder
+    - pull / debounce_ms are accepted and ignored so both classes can be built
+      from the same arguments
+    """
+
+    def __init__(self, pin_a, pin_b, *, pulses_per_detent=3, pull=None, debounce_ms=None):
+        if rotaryio is None:
+            raise RuntimeError("rotaryio is not available on this board")
+        # divisor=1: count every edge, detents are worked out in update()
+        self._enc = rotaryio.IncrementalEncoder(pin_a, pin_b, divisor=1)
+        self._pulses_per_detent = max(1, int(pulses_per_detent))
+        self._offset = self._enc.position
+
+        self._position_raw = 0
+        self._position = 0
+        self._delta_accum = 0
+
+    def update(self):
+        raw = self._enc.position - self._offset
+        if raw == self._position_raw:
+            return False
+        self._position_raw = raw
+        new_pos = raw // self._pulses_per_detent
+        if new_pos != self._position:
+            self._delta_accum += new_pos - self._position
+            self._position = new_pos
+            return True
+        return False
+
+    @property
+    def position(self):
+        return self._position
+
+    @property
+    def position_raw(self):
+        return self._position_raw
+
+    def get_delta(self):
+        d = self._delta_accum
+        self._delta_accum = 0
+        return d
+
+    def reset(self, *, to_detent=None):
+        if to_detent is None:
+            self._position = 0
+        else:
+            self._position = int(to_detent)
+        self._position_raw = self._position * self._pulses_per_detent
+        self._offset = self._enc.position - self._position_raw
+        self._delta_accum = 0
+
+    def report(self, out=print):
+        # 边沿在 C 里数，这边看不到非法跳变和毛刺
+        out("encoder: rotaryio, position {} ({} raw)".format(self._position, self._position_raw))
+
+    def deinit(self):
+        self._enc.deinit()
+
+
+ENCODER_BACKENDS = ("auto", "hardware", "polled")
+
+
+def make_encoder(pin_a, pin_b, *, backend="auto", **kwargs):
+    """
+    Build a rotary encoder with the given backend:
+
+    - "hardware": HardwareRotaryEncoder (needs rotaryio)
+    - "polled": RotaryEncoder, decoded in Python on every update()
+    - "auto": hardware when the port has rotaryio, otherwise polled
+
+    Other keyword arguments are passed to the chosen class.
+    """
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError("backend must be one of {}".format(ENCODER_BACKENDS))
+    if backend == "hardware" or (backend == "auto" and rotaryio is not None):
+        return HardwareRotaryEncoder(pin_a, pin_b, **kwargs)
+    return RotaryEncoder(pin_a, pin_b, **kwargs)
@@ -0,0 +1,103 @@
+from ticks import ticks_ms, ticks_add, ticks_diff
+
+
+class ToneSequencer:
+    """
+    ToneSequencer(pwm, *, volume=0.3, queue_size=8)
+
+    Non-blocking sound effect player that owns the piezo buzzer.
+
+    - pwm: a pwmio.PWMOut created with variable_frequency=True
+    - volume: default duty cycle (0~1) used when play() is not given one
+    - queue_size: how many note tables can wait behind the one playing
+
+    A note table is a tuple of (frequency_hz, duration_s) pairs. A frequency of 0
+    is a rest. play() only queues the table; update() must be called once per
+    main loop iteration and switches notes when their time is up, so the loop
+    never sleeps on audio. Times are ticks.ticks_ms() values; each note's
+    length is turned into whole ms when it starts.
+    """
+
+    def __init__(self, pwm, *, volume=0.3, queue_size=8):
+        self._pwm = pwm
+        self._default_duty = self._to_duty(volume)
+        self._pwm.duty_cycle = 0
+
+        # 固定大小的环形队列，避免在主循环里分配内存
+        self._queue_size = max(1, int(queue_size))
+        self._queue_notes = [None] * self._queue_size
+        self._queue_duty = [0] * self._queue_size
+        self._head = 0
+        self._count = 0
+
+        self._notes = None      # 正在播放的音符表
+        self._duty = 0
+        self._index = 0
+        self._note_end = 0
+
+    @staticmethod
+    def _to_duty(volume):
+        return int(65535 * min(max(volume, 0.0), 1.0))
+
+    def play(self, notes, volume=None):
+        """Queue a note table. Returns False if the queue is full."""
+        if not notes or self._count >= self._queue_size:
+            return False
+        duty = self._default_duty if volume is None else self._to_duty(volume)
+        slot = (self._head + self._count) % self._queue_size
+        self._queue_notes[slot] = notes
+        self._queue_duty[slot] = duty
+        self._count += 1
+        return True
+
+    def stop(self):
+        """Silence the buzzer and drop everything that is queued."""
+        for i in range(self._queue_size):
+            self._queue_notes[i] = None
+        self._head = 0
+        self._count = 0
+        self._notes = None
+        self._pwm.duty_cycle = 0
+
+    @property
+    def busy(self):
+        return self._notes is not None or self._count > 0
+
+    def _start_note(self, start):
+        freq, duration = self._notes[self._index]
+        if freq > 0:
+            self._pwm.frequency = int(freq)
+            self._pwm.duty_cycle = self._duty
+        else:
+            self._pwm.duty_cycle = 0
+        self._note_end = ticks_add(start, int(duration * 1000 + 0.5))
+
+    def update(self, now=None):
+        """Advance the sequencer. Cheap when nothing is playing."""
+        if self._notes is None and self._count == 0:
+            return
+        if now is None:
+            now = ticks_ms()
+
+        if self._notes is not None:
+            late = ticks_diff(now, self._note_end)
+            if late < 0:
+                return
+            self._index += 1
+            if self._index < len(self._notes):
+                # 从上一个音的结束时刻接着排，避免节奏被主循环抖动拉长；
+                # 落后太多（比如被阻塞过）就从现在重新开始
+                start = self._note_end if late < 50 else now
+                self._start_note(start)
+                return
+            self._notes = None
+            self._pwm.duty_cycle = 0
+
+        if self._count > 0:
+            self._notes = self._queue_notes[self._head]
+            self._duty = self._queue_duty[self._head]
+            self._queue_notes[self._head] = None
+            self._head = (self._head + 1) % self._queue_size
+            self._count -= 1
+            self._index = 0
+            self._start_note(now)
@@ -0,0 +1,51 @@
+"""
+Integer millisecond clock shared by the game loop and the drivers.
+
+time.monotonic() is a float: on CircuitPython it drops to 1 ms resolution
+after about an hour of uptime and keeps getting coarser, so debounce times
+and level timers stop being exact on a box that stays on for days.
+ticks_ms() is a small int that counts milliseconds and wraps every
+TICKS_PERIOD ms (about 6.2 days); compare two ticks only with ticks_diff(),
+never with < or -, so the wrap goes unnoticed. Any interval shorter than
+half a period (about 3.1 days) comes out right.
+
+The counter is supervisor.ticks_ms(), the same one adafruit_ticks (and so
+adafruit_debouncer) reads. Ports without it fall back to time.monotonic_ns().
+"""
+
+import time
+
+from micropython import const
+
+TICKS_PERIOD = const(1 << 29)
+_TICKS_MAX = const(TICKS_PERIOD - 1)
+_TICKS_HALFPERIOD = const(TICKS_PERIOD // 2)
+
+try:
+    from supervisor import ticks_ms
+except ImportError:
+    def ticks_ms():
+        return time.monotonic_ns() // 1000000 & _TICKS_MAX
+
+
+def ticks_add(ticks, delta):
+    """ticks + delta ms, wrapped; delta must be shorter than half a period."""
+    if -_TICKS_HALFPERIOD < delta < _TICKS_HALFPERIOD:
+        return (ticks + delta) & _TICKS_MAX
+    raise OverflowError("ticks interval overflow")
+
+
+def ticks_diff(ticks1, ticks2):
+    """Signed ticks1 - ticks2 in ms, correct across the wrap."""
+    diff = (ticks1 - ticks2) & _TICKS_MAX
+    return ((diff + _TICKS_HALFPERIOD) & _TICKS_MAX) - _TICKS_HALFPERIOD
+
+
+def ticks_less(ticks1, ticks2):
+    """True if ticks1 comes before ticks2."""
+    return ticks_diff(ticks2, ticks1) > 0
+
+
+def to_ms(seconds):
+    """Seconds (a setting, a note length) -> whole ms; call at setup, not per loop."""
+    return int(seconds * 1000 + 0.5)
@@ -0,0 +1,18 @@
+"""Host-side simulator for the Diffuser game.
+
+Runs ``src/code.py`` unmodified under CPython by putting fake versions of the
+CircuitPython modules it imports (``board``, ``digitalio``, ``busio``,
+``pwmio``, ``neopixel``, ``displayio``, ``adafruit_adxl34x``,
+``adafruit_displayio_ssd1306`` ...) in front of ``sys.path``. Time is a virtual
+clock that only advances when the game sleeps, so runs are deterministic and
+much faster than real time.
+
+    from sim import run
+    result = run(60, seed=1)
+    print(result.summary())
+    print(result.frames[-1].ascii())
+"""
+
+from sim.runner import SimResult, run
+
+__all__ = ["SimResult", "run"]
@@ -0,0 +1,46 @@
+"""Command line entry point: ``python -m sim --seconds 60``."""
+
+import argparse
+
+from sim.runner import run
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sim", description=__doc__)
+    parser.add_argument("--seconds", type=float, default=60.0,
+                        help="virtual seconds to simulate (default 60)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace", help="trace file with scripted inputs")
+    parser.add_argument("--no-autoplay", dest="autoplay", action="store_false",
+                        help="only use the trace, do not let the bot play")
+    parser.add_argument("--difficulty", type=int, choices=(0, 1, 2), default=0,
+                        help="0=EASY 1=MEDIUM 2=HARD for the bot")
+    parser.add_argument("--reaction", type=float, default=0.25,
+                        help="bot reaction time in seconds")
+    parser.add_argument("--frames", type=int, default=1,
+                        help="print the last N captured frames")
+    parser.add_argument("--setting", action="append", default=[], metavar="NAME=VALUE",
+                        help="value for os.getenv(), like a settings.toml line")
+    parser.add_argument("--rotaryio", action="store_true",
+                        help="simulate a port that has rotaryio (hardware encoder counter)")
+    parser.add_argument("--uptime", type=float, default=0.0, metavar="HOURS",
+                        help="start as if the board had been on this long "
+                             "(ticks_ms wraps after ~149.1 h)")
+    parser.add_argument("--echo", action="store_true",
+                        help="show the game's serial output while running")
+    args = parser.parse_args(argv)
+    settings = dict(item.split("=", 1) for item in args.setting)
+
+    result = run(args.seconds, trace=args.trace, autoplay=args.autoplay,
+                 difficulty=args.difficulty,
+                 reaction=args.reaction, seed=args.seed, settings=settings,
+                 rotaryio=args.rotaryio, uptime=args.uptime * 3600,
+                 echo=args.echo)
+    print(result.summary())
+    for frame in result.frames[-args.frames:] if args.frames > 0 else ():
+        print("t={:.3f}s".format(frame.t))
+        print(frame.ascii())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""A screen-reading bot that plays the game through the simulated inputs.
+
+It only looks at what the OLED labels say, the same way a player would, so it
+keeps working whatever the game does internally.
+"""
+
+from sim.trace import Actions
+
+COMMANDS = ("DIAL", "CUT WIRE", "STEADY", "SHAKE", "TILT L", "TILT R", "TILT F", "TILT B",
+            "TAP TAP")
+TILTS = {"TILT L": "left", "TILT R": "right", "TILT F": "forward", "TILT B": "back"}
+DIFFICULTIES = ("EASY", "MEDIUM", "HARD")
+
+
+def screen_texts(display):
+    """All non-empty label texts currently in the display tree."""
+    texts = []
+
+    def walk(group):
+        if group is None or getattr(group, "hidden", False):
+            return
+        for item in group:
+            if getattr(item, "hidden", False):
+                continue
+            text = getattr(item, "text", None)
+            if text is not None:
+                if text:
+                    texts.append(text)
+            elif hasattr(item, "__iter__"):
+                walk(item)
+
+    if display is not None:
+        walk(display.root_group)
+    return texts
+
+
+class AutoPlayer:
+    """Hardware listener that reacts to the screen like a (fast) human."""
+
+    def __init__(self, hardware, *, difficulty=0, reaction=0.25, retry=1.0,
+                 shake_time=0.5, tilt_time=0.3):
+        self.hw = hardware
+        self.actions = Actions(hardware)
+        self.target = DIFFICULTIES[difficulty]
+        self.reaction = reaction
+        self.retry = retry
+        self.shake_time = shake_time
+        self.tilt_time = tilt_time
+        self._busy_until = 0.0
+        self._last_sig = None
+        self._last_time = -1e9
+        self.moves = 0
+
+    def _decide(self, texts):
+        """Return (signature, action) for the screen, or (None, None) to wait."""
+        joined = "\n".join(texts)
+        if "SET PLAYER" in texts:
+            return ("name", joined), self.actions.press
+        if "Main Menu" in texts:
+            selected = [t[2:] for t in texts if t.startswith("> ")]
+            if not selected:
+                return None, None
+            if selected[0] == self.target:
+                return ("menu", joined), self.actions.press
+            if selected[0] in DIFFICULTIES:
+                step = 1 if DIFFICULTIES.index(self.target) > DIFFICULTIES.index(selected[0]) else -1
+            else:
+                step = 1
+            return ("menu", joined), lambda t: self.actions.dial(t, step)
+        for text in texts:
+            if "Score:" not in text:
+                continue
+            for name in COMMANDS:
+                if text.startswith(name + " "):
+                    return ("cmd", text), self._command_action(name)
+        for text in texts:
+            if text in ("YOU WIN!", "GAME OVER", "HIGH SCORES") or text.endswith("Clear!"):
+                return ("result", joined), self.actions.press
+        return None, None
+
+    def _command_action(self, name):
+        if name == "DIAL":
+            return lambda t: self.actions.dial(t, 1)
+        if name == "CUT WIRE":
+            return self.actions.press
+        if name == "SHAKE":
+            return lambda t: self.actions.shake(t, self.shake_time)
+        if name == "TAP TAP":
+            return self.actions.tap
+        if name in TILTS:
+            return lambda t: self.actions.tilt(t, TILTS[name], self.tilt_time)
+        return self.actions.still
+
+    def __call__(self, now):
+        if now < self._busy_until:
+            return
+        sig, action = self._decide(screen_texts(self.hw.display))
+        if action is None:
+            return
+        if sig == self._last_sig and now - self._last_time < self.retry:
+            return
+        self._last_sig = sig
+        self._last_time = now
+        self.moves += 1
+        self._busy_until = action(now + self.reaction) + 0.05
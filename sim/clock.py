@@ -0,0 +1,89 @@
+"""Virtual clock and the ``time`` module shim handed to the game."""
+
+import math
+import sys
+import time as _real_time
+import types
+
+TICKS_MAX = (1 << 29) - 1
+# CircuitPython floats keep 30 bits: 22 significant bits instead of float32's 24
+_FLOAT_BITS = 22
+
+
+class SimulationEnd(BaseException):
+    """Raised from the fake ``time.sleep`` to stop the game's ``while True`` loop.
+
+    Derives from BaseException so the game's bare ``except:`` blocks cannot
+    swallow it.
+    """
+
+
+def _board_float(value):
+    """Round like a CircuitPython float, which runs out of ms after about an hour."""
+    if value == 0:
+        return 0.0
+    m, e = math.frexp(value)
+    return math.ldexp(round(m * (1 << _FLOAT_BITS)), e - _FLOAT_BITS)
+
+
+class VirtualClock:
+    """Monotonic time that only moves when the game sleeps.
+
+    ``now`` counts from the start of the simulation. ``uptime`` is how long
+    the board had already been on by then: the game's clocks (monotonic,
+    monotonic_ns and ticks_ms) start from there, so a run can be fast-forwarded
+    to a long uptime, e.g. just before ticks_ms() wraps after ~149 hours.
+    """
+
+    def __init__(self, start=0.0, uptime=0.0):
+        self.now = float(start)
+        self.uptime = float(uptime)
+
+    def monotonic(self):
+        return _board_float(self.uptime + self.now)
+
+    def monotonic_ns(self):
+        return int((self.uptime + self.now) * 1_000_000_000)
+
+    def ticks_ms(self, at=None):
+        """supervisor.ticks_ms() now, or at virtual time ``at``."""
+        t = self.now if at is None else at
+        return int((self.uptime + t) * 1000) & TICKS_MAX
+
+    def advance(self, dt):
+        if dt > 0:
+            self.now += dt
+
+
+def make_time_module(hardware):
+    """Build a stand-in ``time`` module driven by ``hardware.clock``.
+
+    Anything the shim does not define falls through to the real module.
+    """
+    mod = types.ModuleType("time")
+    clock = hardware.clock
+    epoch = _real_time.time()
+
+    mod.monotonic = clock.monotonic
+    mod.monotonic_ns = clock.monotonic_ns
+    mod.sleep = hardware.sleep
+    mod.time = lambda: epoch + clock.now
+    mod.__getattr__ = lambda name: getattr(_real_time, name)
+    return mod
+
+
+class patched_time:
+    """Context manager that swaps ``sys.modules['time']`` for the shim."""
+
+    def __init__(self, hardware):
+        self._shim = make_time_module(hardware)
+        self._saved = None
+
+    def __enter__(self):
+        self._saved = sys.modules["time"]
+        sys.modules["time"] = self._shim
+        return self._shim
+
+    def __exit__(self, *exc):
+        sys.modules["time"] = self._saved
+        return False
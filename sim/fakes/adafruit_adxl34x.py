@@ -0,0 +1,198 @@
+"""Fake ``adafruit_adxl34x`` that drives the simulated register model over I2C.
+
+Mirrors the public API of the Adafruit driver so game code cannot tell the
+difference.
+"""
+
+import struct
+
+from micropython import const
+
+_ADXL345_DEFAULT_ADDRESS = const(0x53)
+_ADXL345_MG2G_MULTIPLIER = 0.004
+_STANDARD_GRAVITY = 9.80665
+
+_REG_THRESH_TAP = const(0x1D)
+_REG_DUR = const(0x21)
+_REG_LATENT = const(0x22)
+_REG_WINDOW = const(0x23)
+_REG_THRESH_ACT = const(0x24)
+_REG_THRESH_FF = const(0x28)
+_REG_TIME_FF = const(0x29)
+_REG_ACT_INACT_CTL = const(0x27)
+_REG_TAP_AXES = const(0x2A)
+_REG_BW_RATE = const(0x2C)
+_REG_POWER_CTL = const(0x2D)
+_REG_INT_ENABLE = const(0x2E)
+_REG_INT_MAP = const(0x2F)
+_REG_INT_SOURCE = const(0x30)
+_REG_DATA_FORMAT = const(0x31)
+_REG_DATAX0 = const(0x32)
+
+_INT_SINGLE_TAP = const(0b01000000)
+_INT_DOUBLE_TAP = const(0b00100000)
+_INT_ACT = const(0b00010000)
+_INT_FREE_FALL = const(0b00000100)
+
+
+class DataRate:
+    RATE_3200_HZ = const(0b1111)
+    RATE_1600_HZ = const(0b1110)
+    RATE_800_HZ = const(0b1101)
+    RATE_400_HZ = const(0b1100)
+    RATE_200_HZ = const(0b1011)
+    RATE_100_HZ = const(0b1010)
+    RATE_50_HZ = const(0b1001)
+    RATE_25_HZ = const(0b1000)
+    RATE_12_5_HZ = const(0b0111)
+    RATE_6_25HZ = const(0b0110)
+    RATE_3_13_HZ = const(0b0101)
+    RATE_1_56_HZ = const(0b0100)
+    RATE_0_78_HZ = const(0b0011)
+    RATE_0_39_HZ = const(0b0010)
+    RATE_0_20_HZ = const(0b0001)
+    RATE_0_10_HZ = const(0b0000)
+
+
+class Range:
+    RANGE_16_G = const(0b11)
+    RANGE_8_G = const(0b10)
+    RANGE_4_G = const(0b01)
+    RANGE_2_G = const(0b00)
+
+
+class ADXL345:
+    def __init__(self, i2c, address=_ADXL345_DEFAULT_ADDRESS):
+        self._i2c = i2c
+        self._address = address
+        self._buffer = bytearray(6)
+        self._write_register_byte(_REG_POWER_CTL, 0x08)
+        self._write_register_byte(_REG_INT_ENABLE, 0x0)
+        self._enabled_interrupts = {}
+        self._event_status = {}
+
+    def _read_register(self, register, length):
+        while not self._i2c.try_lock():
+            pass
+        try:
+            out = bytearray(length)
+            self._i2c.writeto_then_readfrom(self._address, bytes([register]), out)
+            return out
+        finally:
+            self._i2c.unlock()
+
+    def _read_register_unpacked(self, register):
+        return self._read_register(register, 1)[0]
+
+    def _write_register_byte(self, register, value):
+        while not self._i2c.try_lock():
+            pass
+        try:
+            self._i2c.writeto(self._address, bytes([register, value & 0xFF]))
+        finally:
+            self._i2c.unlock()
+
+    @property
+    def acceleration(self):
+        x, y, z = struct.unpack("<hhh", self._read_register(_REG_DATAX0, 6))
+        k = _ADXL345_MG2G_MULTIPLIER * _STANDARD_GRAVITY
+        return (x * k, y * k, z * k)
+
+    @property
+    def raw_x(self):
+        return struct.unpack("<h", self._read_register(_REG_DATAX0, 2))[0]
+
+    @property
+    def raw_y(self):
+        return struct.unpack("<h", self._read_register(_REG_DATAX0 + 2, 2))[0]
+
+    @property
+    def raw_z(self):
+        return struct.unpack("<h", self._read_register(_REG_DATAX0 + 4, 2))[0]
+
+    @property
+    def events(self):
+        interrupt_source_register = self._read_register_unpacked(_REG_INT_SOURCE)
+        self._event_status.clear()
+        for event_type, value in self._enabled_interrupts.items():
+            if event_type == "motion":
+                self._event_status[event_type] = interrupt_source_register & _INT_ACT > 0
+            if event_type == "tap":
+                if value == 1:
+                    self._event_status[event_type] = interrupt_source_register & _INT_SINGLE_TAP > 0
+                else:
+                    self._event_status[event_type] = interrupt_source_register & _INT_DOUBLE_TAP > 0
+            if event_type == "freefall":
+                self._event_status[event_type] = interrupt_source_register & _INT_FREE_FALL > 0
+        return self._event_status
+
+    def _enable(self, bits):
+        active = self._read_register_unpacked(_REG_INT_ENABLE)
+        self._write_register_byte(_REG_INT_ENABLE, 0x0)
+        return active | bits
+
+    def enable_motion_detection(self, *, threshold=18):
+        active = self._enable(_INT_ACT)
+        self._write_register_byte(_REG_INT_MAP, 0x0)
+        self._write_register_byte(_REG_ACT_INACT_CTL, 0b01110000)
+        self._write_register_byte(_REG_THRESH_ACT, threshold)
+        self._write_register_byte(_REG_INT_ENABLE, active)
+        self._enabled_interrupts["motion"] = True
+
+    def disable_motion_detection(self):
+        active = self._read_register_unpacked(_REG_INT_ENABLE) & ~_INT_ACT
+        self._write_register_byte(_REG_INT_ENABLE, active)
+        self._enabled_interrupts.pop("motion", None)
+
+    def enable_freefall_detection(self, *, threshold=10, time=25):
+        active = self._enable(_INT_FREE_FALL)
+        self._write_register_byte(_REG_INT_MAP, 0x0)
+        self._write_register_byte(_REG_THRESH_FF, threshold)
+        self._write_register_byte(_REG_TIME_FF, time)
+        self._write_register_byte(_REG_INT_ENABLE, active)
+        self._enabled_interrupts["freefall"] = True
+
+    def disable_freefall_detection(self):
+        active = self._read_register_unpacked(_REG_INT_ENABLE) & ~_INT_FREE_FALL
+        self._write_register_byte(_REG_INT_ENABLE, active)
+        self._enabled_interrupts.pop("freefall", None)
+
+    def enable_tap_detection(self, *, tap_count=1, threshold=20, duration=50,
+                             latency=20, window=255):
+        bits = _INT_SINGLE_TAP if tap_count == 1 else _INT_DOUBLE_TAP
+        active = self._enable(bits)
+        self._write_register_byte(_REG_INT_MAP, 0x0)
+        self._write_register_byte(_REG_TAP_AXES, 0b00000111)
+        self._write_register_byte(_REG_THRESH_TAP, threshold)
+        self._write_register_byte(_REG_DUR, duration)
+        self._write_register_byte(_REG_LATENT, latency)
+        self._write_register_byte(_REG_WINDOW, window)
+        self._write_register_byte(_REG_INT_ENABLE, active)
+        self._enabled_interrupts["tap"] = tap_count
+
+    def disable_tap_detection(self):
+        active = self._read_register_unpacked(_REG_INT_ENABLE)
+        active &= ~(_INT_SINGLE_TAP | _INT_DOUBLE_TAP)
+        self._write_register_byte(_REG_INT_ENABLE, active)
+        self._enabled_interrupts.pop("tap", None)
+
+    @property
+    def data_rate(self):
+        return self._read_register_unpacked(_REG_BW_RATE) & 0x0F
+
+    @data_rate.setter
+    def data_rate(self, val):
+        self._write_register_byte(_REG_BW_RATE, val)
+
+    @property
+    def range(self):
+        return self._read_register_unpacked(_REG_DATA_FORMAT) & 0x03
+
+    @range.setter
+    def range(self, val):
+        fmt = self._read_register_unpacked(_REG_DATA_FORMAT)
+        self._write_register_byte(_REG_DATA_FORMAT, (fmt & ~0x0F) | val | 0x08)
+
+
+class ADXL343(ADXL345):
+    pass
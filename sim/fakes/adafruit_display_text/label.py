@@ -0,0 +1,62 @@
+"""Fake ``adafruit_display_text.label.Label``."""
+
+import displayio
+from sim.hardware import current
+
+
+class Label(displayio.Group):
+    def __init__(self, font, *, text="", x=0, y=0, color=0xFFFFFF, scale=1, **kwargs):
+        super().__init__(scale=scale, x=x, y=y)
+        self.font = font
+        self.color = color
+        self._text = str(text)
+        self._anchor_point = None
+        self._anchored_position = None
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, value):
+        # the real Label re-lays out its glyphs on every assignment
+        current().label_writes += 1
+        value = str(value)
+        if value != self._text:
+            self._text = value
+            displayio._mark_dirty()
+            self._apply_anchor()
+
+    @property
+    def width(self):
+        return 6 * len(self._text)
+
+    @property
+    def height(self):
+        return 12
+
+    @property
+    def anchor_point(self):
+        return self._anchor_point
+
+    @anchor_point.setter
+    def anchor_point(self, value):
+        self._anchor_point = value
+        self._apply_anchor()
+
+    @property
+    def anchored_position(self):
+        return self._anchored_position
+
+    @anchored_position.setter
+    def anchored_position(self, value):
+        self._anchored_position = value
+        self._apply_anchor()
+
+    def _apply_anchor(self):
+        if self._anchor_point is None or self._anchored_position is None:
+            return
+        ax, ay = self._anchor_point
+        px, py = self._anchored_position
+        self.x = int(px - ax * self.width)
+        self.y = int(py - ay * self.height + self.height // 2)
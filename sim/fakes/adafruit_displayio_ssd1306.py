@@ -0,0 +1,53 @@
+"""Fake ``adafruit_displayio_ssd1306.SSD1306`` that captures frames."""
+
+import displayio
+from sim.hardware import Frame, current
+
+
+class SSD1306:
+    AUTO_REFRESH_FPS = 60
+
+    def __init__(self, bus, *, width=128, height=64, **kwargs):
+        self._hw = current()
+        self._bus = bus
+        self.width = width
+        self.height = height
+        self._root_group = None
+        self.auto_refresh = True
+        self.brightness = 1.0
+        self.rotation = 0
+        self._next_auto = 0.0
+        self._hw.display = self
+        self._hw.listeners.append(self._auto_refresh_tick)
+
+    @property
+    def root_group(self):
+        return self._root_group
+
+    @root_group.setter
+    def root_group(self, group):
+        self._root_group = group
+        self._hw.display_dirty = True
+
+    def _auto_refresh_tick(self, now):
+        if self.auto_refresh and now >= self._next_auto:
+            self._next_auto = now + 1.0 / self.AUTO_REFRESH_FPS
+            self._render()
+
+    def _render(self):
+        hw = self._hw
+        if not hw.display_dirty:
+            return False
+        hw.display_dirty = False
+        labels, tiles = displayio.collect(self._root_group)
+        hw.capture_frame(Frame(hw.clock.now, self.width, self.height, labels, tiles))
+        # 8 pages of 128 bytes, each preceded by its page address commands
+        page = bytes(self.width)
+        for p in range(self.height // 8):
+            self._bus.send(0xB0 | p, b"")
+            self._bus.i2c.writeto(self._bus.device_address, b"\x40" + page)
+        return True
+
+    def refresh(self, *, target_frames_per_second=None, minimum_frames_per_second=0):
+        self._render()
+        return True
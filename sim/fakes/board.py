@@ -0,0 +1,25 @@
+"""Fake ``board``: pin objects named like the Xiao ESP32-C3."""
+
+from sim.hardware import Hardware
+
+
+class Pin:
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return "board.{}".format(self.name)
+
+
+for _name in Hardware.PIN_NAMES:
+    globals()[_name] = Pin(_name)
+
+_i2c = None
+
+
+def I2C():
+    global _i2c
+    if _i2c is None:
+        import busio
+        _i2c = busio.I2C(SCL, SDA)  # noqa: F821 - created above
+    return _i2c
@@ -0,0 +1,60 @@
+"""Fake ``busio.I2C`` that routes transactions to the simulated devices."""
+
+from sim.hardware import current
+
+
+class I2C:
+    def __init__(self, scl, sda, *, frequency=100000, timeout=255):
+        self._hw = current()
+        self.frequency = frequency
+        self._locked = False
+
+    def try_lock(self):
+        if self._locked:
+            return False
+        self._locked = True
+        return True
+
+    def unlock(self):
+        self._locked = False
+
+    def scan(self):
+        return sorted(self._hw.i2c_devices)
+
+    def _device(self, address):
+        dev = self._hw.i2c_devices.get(address)
+        if dev is None:
+            raise OSError(19, "No such device")  # ENODEV, like the firmware
+        return dev
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        data = bytes(buffer[start:end])
+        self._device(address).write(data)
+        self._hw.i2c_count(address, len(data), self.frequency)
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        if end is None:
+            end = len(buffer)
+        data = self._device(address).read(end - start)
+        buffer[start:end] = data
+        self._hw.i2c_count(address, len(data), self.frequency)
+
+    def writeto_then_readfrom(self, address, buffer_out, buffer_in, *,
+                              out_start=0, out_end=None, in_start=0, in_end=None):
+        dev = self._device(address)
+        out = bytes(buffer_out[out_start:out_end])
+        dev.write(out)
+        if in_end is None:
+            in_end = len(buffer_in)
+        data = dev.read(in_end - in_start)
+        buffer_in[in_start:in_end] = data
+        self._hw.i2c_count(address, len(out) + len(data), self.frequency, starts=2)
+
+    def deinit(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.deinit()
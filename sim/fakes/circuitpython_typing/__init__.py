@@ -0,0 +1 @@
+"""Fake ``circuitpython_typing`` package: only the names the Adafruit libraries annotate with."""
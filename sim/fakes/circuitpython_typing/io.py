@@ -0,0 +1,8 @@
+"""Fake ``circuitpython_typing.io``."""
+
+from typing import Protocol
+
+
+class ROValueIO(Protocol):
+    @property
+    def value(self) -> bool: ...
@@ -0,0 +1,51 @@
+"""Fake ``digitalio`` backed by the simulated pin levels."""
+
+from sim.hardware import current
+
+
+class Direction:
+    INPUT = "INPUT"
+    OUTPUT = "OUTPUT"
+
+
+class Pull:
+    UP = "UP"
+    DOWN = "DOWN"
+
+
+class DriveMode:
+    PUSH_PULL = "PUSH_PULL"
+    OPEN_DRAIN = "OPEN_DRAIN"
+
+
+class DigitalInOut:
+    def __init__(self, pin):
+        self._hw = current()
+        self._name = pin.name
+        self.direction = Direction.INPUT
+        self.pull = None
+
+    def switch_to_input(self, pull=None):
+        self.direction = Direction.INPUT
+        self.pull = pull
+
+    def switch_to_output(self, value=False, drive_mode=DriveMode.PUSH_PULL):
+        self.direction = Direction.OUTPUT
+        self.value = value
+
+    @property
+    def value(self):
+        return self._hw.pin_level(self._name)
+
+    @value.setter
+    def value(self, level):
+        self._hw.set_pin(self._name, level)
+
+    def deinit(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.deinit()
@@ -0,0 +1,162 @@
+"""Fake ``displayio``: just enough of the object tree to capture frames."""
+
+from sim.hardware import current
+
+
+def _mark_dirty():
+    current().display_dirty = True
+
+
+def release_displays():
+    pass
+
+
+class Group:
+    def __init__(self, *, scale=1, x=0, y=0):
+        self._items = []
+        self.scale = scale
+        self._x = x
+        self._y = y
+        self._hidden = False
+
+    def _set(name):
+        attr = "_" + name
+
+        def getter(self):
+            return getattr(self, attr)
+
+        def setter(self, value):
+            if getattr(self, attr) != value:
+                setattr(self, attr, value)
+                _mark_dirty()
+
+        return property(getter, setter)
+
+    x = _set("x")
+    y = _set("y")
+    hidden = _set("hidden")
+    del _set
+
+    def append(self, item):
+        self._items.append(item)
+        _mark_dirty()
+
+    def insert(self, index, item):
+        self._items.insert(index, item)
+        _mark_dirty()
+
+    def remove(self, item):
+        self._items.remove(item)
+        _mark_dirty()
+
+    def pop(self, index=-1):
+        _mark_dirty()
+        return self._items.pop(index)
+
+    def index(self, item):
+        return self._items.index(item)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __setitem__(self, index, item):
+        self._items[index] = item
+        _mark_dirty()
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __contains__(self, item):
+        return item in self._items
+
+
+class Bitmap:
+    def __init__(self, width, height, value_count):
+        self.width = width
+        self.height = height
+        self.value_count = value_count
+        self._data = bytearray(width * height)
+
+    def _offset(self, key):
+        if isinstance(key, tuple):
+            x, y = key
+            return y * self.width + x
+        return key
+
+    def __getitem__(self, key):
+        return self._data[self._offset(key)]
+
+    def __setitem__(self, key, value):
+        self._data[self._offset(key)] = value
+        _mark_dirty()
+
+    def fill(self, value):
+        for i in range(len(self._data)):
+            self._data[i] = value
+        _mark_dirty()
+
+
+class Palette:
+    def __init__(self, color_count, *, dither=False):
+        self._colors = [0] * color_count
+        self._transparent = set()
+
+    def __len__(self):
+        return len(self._colors)
+
+    def __getitem__(self, index):
+        if index in self._transparent:
+            return 0
+        return self._colors[index]
+
+    def __setitem__(self, index, color):
+        self._colors[index] = color
+        _mark_dirty()
+
+    def make_transparent(self, index):
+        self._transparent.add(index)
+
+    def make_opaque(self, index):
+        self._transparent.discard(index)
+
+
+class TileGrid:
+    def __init__(self, bitmap, *, pixel_shader, x=0, y=0, width=1, height=1,
+                 tile_width=None, tile_height=None, default_tile=0):
+        self.bitmap = bitmap
+        self.pixel_shader = pixel_shader
+        self._x = x
+        self._y = y
+        self._hidden = False
+
+    x = property(lambda self: self._x, lambda self, v: self._move("_x", v))
+    y = property(lambda self: self._y, lambda self, v: self._move("_y", v))
+    hidden = property(lambda self: self._hidden, lambda self, v: self._move("_hidden", v))
+
+    def _move(self, attr, value):
+        if getattr(self, attr) != value:
+            setattr(self, attr, value)
+            _mark_dirty()
+
+
+def collect(group, ox=0, oy=0, labels=None, tiles=None):
+    """Flatten a group tree into ([(x, y, text)], [(x, y, bitmap, palette)])."""
+    if labels is None:
+        labels, tiles = [], []
+    if group is None or group.hidden:
+        return labels, tiles
+    ox += group.x
+    oy += group.y
+    for item in group:
+        if getattr(item, "hidden", False):
+            continue
+        if hasattr(item, "text"):
+            labels.append((ox + item.x, oy + item.y, item.text))
+        elif isinstance(item, TileGrid):
+            tiles.append((ox + item.x, oy + item.y, item.bitmap, item.pixel_shader))
+        elif isinstance(item, Group):
+            collect(item, ox, oy, labels, tiles)
+    return labels, tiles
@@ -0,0 +1,11 @@
+"""Fake ``i2cdisplaybus.I2CDisplayBus``."""
+
+
+class I2CDisplayBus:
+    def __init__(self, i2c_bus, *, device_address, reset=None):
+        self.i2c = i2c_bus
+        self.device_address = device_address
+
+    def send(self, command, data):
+        buf = bytes([0x80, command]) + (bytes([0x40]) + bytes(data) if data else b"")
+        self.i2c.writeto(self.device_address, buf)
@@ -0,0 +1,104 @@
+"""Fake ``keypad``: only ``Keys``, scanned in the background on the virtual clock.
+
+Every ``interval`` a scan is scheduled on the simulated hardware, like the
+port's background task. Scans run in time order with the other scheduled
+input, even the ones that fall due while the game is blocked, so their
+events carry the ticks of the scan itself.
+"""
+
+from collections import deque
+
+from sim.hardware import current
+
+
+class Event:
+    def __init__(self, key_number=0, pressed=True, timestamp=None):
+        self.key_number = key_number
+        self.pressed = pressed
+        self.timestamp = timestamp
+
+    @property
+    def released(self):
+        return not self.pressed
+
+    def __eq__(self, other):
+        return (self.key_number, self.pressed) == (other.key_number, other.pressed)
+
+    def __repr__(self):
+        return "<Event: key_number {} {}>".format(
+            self.key_number, "pressed" if self.pressed else "released")
+
+
+class EventQueue:
+    def __init__(self, max_events):
+        self._events = deque()
+        self._max = max_events
+        self.overflowed = False
+
+    def _put(self, key_number, pressed, timestamp):
+        if len(self._events) >= self._max:
+            self.overflowed = True
+            return
+        self._events.append((key_number, pressed, timestamp))
+
+    def get(self):
+        if not self._events:
+            return None
+        return Event(*self._events.popleft())
+
+    def get_into(self, event):
+        if not self._events:
+            return False
+        event.key_number, event.pressed, event.timestamp = self._events.popleft()
+        return True
+
+    def clear(self):
+        self._events.clear()
+        self.overflowed = False
+
+    def __len__(self):
+        return len(self._events)
+
+    def __bool__(self):
+        return bool(self._events)
+
+
+class Keys:
+    def __init__(self, pins, *, value_when_pressed, pull=True, interval=0.02,
+                 max_events=64, debounce_threshold=1):
+        self._hw = current()
+        self._names = [pin.name for pin in pins]
+        self._value_when_pressed = bool(value_when_pressed)
+        self._interval = interval
+        self._threshold = max(1, int(debounce_threshold))
+        self.events = EventQueue(max_events)
+        self.key_count = len(self._names)
+        self._pressed = [False] * self.key_count
+        self._runs = [0] * self.key_count
+        self._running = True
+        self._schedule(self._hw.clock.now + interval)
+
+    def _schedule(self, t):
+        self._hw.schedule(t, lambda: self._scan(t))
+
+    def _scan(self, t):
+        if not self._running:
+            return
+        for i, name in enumerate(self._names):
+            pressed = self._hw.pin_level(name) == self._value_when_pressed
+            if pressed == self._pressed[i]:
+                self._runs[i] = 0
+                continue
+            self._runs[i] += 1
+            if self._runs[i] >= self._threshold:
+                self._runs[i] = 0
+                self._pressed[i] = pressed
+                self.events._put(i, pressed, self._hw.clock.ticks_ms(at=t))
+        self._schedule(t + self._interval)
+
+    def reset(self):
+        self._pressed = [False] * self.key_count
+        self._runs = [0] * self.key_count
+
+    def deinit(self):
+        self._running = False
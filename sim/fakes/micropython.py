@@ -0,0 +1,12 @@
+"""Fake ``micropython`` module for CPython."""
+
+
+def const(value):
+    return value
+
+
+def native(func):
+    return func
+
+
+viper = native
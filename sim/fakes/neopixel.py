@@ -0,0 +1,48 @@
+"""Fake ``neopixel.NeoPixel`` that records every color change."""
+
+from sim.hardware import current
+
+RGB = "RGB"
+GRB = "GRB"
+RGBW = "RGBW"
+GRBW = "GRBW"
+
+
+class NeoPixel:
+    def __init__(self, pin, n, *, bpp=3, brightness=1.0, auto_write=True, pixel_order=None):
+        self._hw = current()
+        self.n = n
+        self.bpp = bpp
+        self.brightness = brightness
+        self.auto_write = auto_write
+        self._buf = [(0,) * bpp for _ in range(n)]
+        self._shown = None
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, index):
+        return self._buf[index]
+
+    def __setitem__(self, index, color):
+        self._buf[index] = tuple(color)
+        if self.auto_write:
+            self.show()
+
+    def fill(self, color):
+        color = tuple(color)
+        for i in range(self.n):
+            self._buf[i] = color
+        if self.auto_write:
+            self.show()
+
+    def show(self):
+        hw = self._hw
+        hw.pixel_writes += 1
+        colors = tuple(self._buf)
+        if colors != self._shown:
+            self._shown = colors
+            hw.pixel_log.append((hw.clock.now, colors))
+
+    def deinit(self):
+        pass
@@ -0,0 +1,42 @@
+"""Fake ``pwmio.PWMOut`` that logs what the buzzer plays."""
+
+from sim.hardware import current
+
+
+class PWMOut:
+    def __init__(self, pin, *, duty_cycle=0, frequency=500, variable_frequency=False):
+        self._hw = current()
+        self._duty_cycle = duty_cycle
+        self._frequency = frequency
+        self.variable_frequency = variable_frequency
+
+    def _log(self):
+        self._hw.tone_log.append((self._hw.clock.now, self._frequency, self._duty_cycle))
+
+    @property
+    def duty_cycle(self):
+        return self._duty_cycle
+
+    @duty_cycle.setter
+    def duty_cycle(self, value):
+        value = int(value)
+        if value != self._duty_cycle:
+            self._duty_cycle = value
+            self._log()
+
+    @property
+    def frequency(self):
+        return self._frequency
+
+    @frequency.setter
+    def frequency(self, value):
+        if not self.variable_frequency:
+            raise AttributeError("PWMOut created without variable_frequency=True")
+        value = int(value)
+        if value != self._frequency:
+            self._frequency = value
+            if self._duty_cycle:
+                self._log()
+
+    def deinit(self):
+        pass
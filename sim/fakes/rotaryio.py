@@ -0,0 +1,45 @@
+"""Fake ``rotaryio``: counts quadrature edges as the pins change.
+
+Only importable when the simulated board has rotaryio (``run(rotaryio=True)``),
+like a real port with a pulse counter peripheral.
+"""
+
+from sim.hardware import current
+
+if not current().has_rotaryio:
+    raise ImportError("no module named 'rotaryio'")
+
+# q = A<<1 | B; +1 / -1 for the four legal transitions each way
+_STEP = {0b0001: 1, 0b0111: 1, 0b1110: 1, 0b1000: 1,
+         0b0010: -1, 0b1011: -1, 0b1101: -1, 0b0100: -1}
+
+
+class IncrementalEncoder:
+    def __init__(self, pin_a, pin_b, divisor=4):
+        self._hw = current()
+        self._a = pin_a.name
+        self._b = pin_b.name
+        self.divisor = divisor
+        self._count = 0
+        self._q = self._read()
+        self._hw.watch_pin(self._a, self._edge)
+        self._hw.watch_pin(self._b, self._edge)
+
+    def _read(self):
+        return (self._hw.pin_level(self._a) << 1) | self._hw.pin_level(self._b)
+
+    def _edge(self):
+        q = self._read()
+        self._count += _STEP.get((self._q << 2) | q, 0)
+        self._q = q
+
+    @property
+    def position(self):
+        return self._count // self.divisor
+
+    @position.setter
+    def position(self, value):
+        self._count = value * self.divisor
+
+    def deinit(self):
+        pass
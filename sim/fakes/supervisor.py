@@ -0,0 +1,20 @@
+"""Fake ``supervisor`` module."""
+
+from sim.hardware import current
+
+
+def ticks_ms():
+    return current().clock.ticks_ms()
+
+
+class _Runtime:
+    @property
+    def serial_connected(self):
+        return True
+
+    @property
+    def serial_bytes_available(self):
+        return len(current().serial_rx)
+
+
+runtime = _Runtime()
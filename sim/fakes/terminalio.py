@@ -0,0 +1,9 @@
+"""Fake ``terminalio``: only the built-in 6x12 font metrics are needed."""
+
+
+class _BuiltinFont:
+    def get_bounding_box(self):
+        return (6, 12)
+
+
+FONT = _BuiltinFont()
@@ -0,0 +1,547 @@
+"""Shared state of the simulated board.
+
+The fake CircuitPython modules in ``sim/fakes`` all talk to the one
+``Hardware`` instance returned by ``current()``: pin levels, the I2C bus with
+its devices, the buzzer / NeoPixel logs and the captured display frames.
+"""
+
+import heapq
+import math
+import random
+
+from sim.clock import SimulationEnd, VirtualClock
+
+_current = None
+
+
+def current():
+    if _current is None:
+        raise RuntimeError("no simulated hardware is active; use sim.run()")
+    return _current
+
+
+def activate(hardware):
+    global _current
+    _current = hardware
+
+
+STANDARD_GRAVITY = 9.80665
+
+
+class AccelModel:
+    """Produces the acceleration (m/s^2) seen by the ADXL345 at a given time."""
+
+    MODE_STILL = "still"
+    MODE_SHAKE = "shake"
+
+    def __init__(self, seed=0, noise=0.03):
+        self._rng = random.Random(seed)
+        self.noise = noise
+        self.gravity = (0.0, 0.0, STANDARD_GRAVITY)
+        self.mode = self.MODE_STILL
+        self.shake_amplitude = 14.0   # m/s^2
+        self.shake_hz = 7.0
+        self._mode_start = 0.0
+        self.tap_g = 3.0              # 敲一下：Z 轴上一个短脉冲
+        self.tap_s = 0.015
+        self._taps = []
+
+    def set_still(self, now):
+        self.mode = self.MODE_STILL
+        self._mode_start = now
+
+    def set_shake(self, now, amplitude=None, hz=None):
+        self.mode = self.MODE_SHAKE
+        self._mode_start = now
+        if amplitude is not None:
+            self.shake_amplitude = amplitude
+        if hz is not None:
+            self.shake_hz = hz
+
+    def set_gravity(self, x, y, z):
+        self.gravity = (x, y, z)
+
+    def add_tap(self, t):
+        self._taps.append(t)
+
+    def _tap(self, t):
+        taps = self._taps
+        while taps and taps[0] + self.tap_s < t - 3.0:   # INT_SOURCE 最多回看 2 s
+            taps.pop(0)
+        for start in taps:
+            if start <= t < start + self.tap_s:
+                return self.tap_g * STANDARD_GRAVITY
+        return 0.0
+
+    def sample(self, t):
+        gx, gy, gz = self.gravity
+        n = self.noise
+        x = gx + self._rng.gauss(0.0, n)
+        y = gy + self._rng.gauss(0.0, n)
+        z = gz + self._rng.gauss(0.0, n)
+        if self.mode == self.MODE_SHAKE:
+            phase = 2 * math.pi * self.shake_hz * (t - self._mode_start)
+            a = self.shake_amplitude
+            x += a * math.sin(phase)
+            y += 0.6 * a * math.sin(phase * 1.3)
+        if self._taps:
+            z += self._tap(t)
+        return (x, y, z)
+
+
+class I2CDevice:
+    """Register-pointer style I2C target: first written byte selects a register."""
+
+    def __init__(self, hardware, address):
+        self.hw = hardware
+        self.address = address
+        self.pointer = 0
+
+    def write(self, data):
+        pass
+
+    def read(self, n):
+        return bytes(n)
+
+
+class Adxl345Device(I2CDevice):
+    """Register model of an ADXL345 at 0x53.
+
+    Samples are indexed by output-data-rate tick. In bypass mode DATAX0..DATAZ1
+    return the newest sample; any other FIFO_CTL mode is modelled as stream
+    mode: up to 32 unread samples are kept and each data read pops the oldest.
+    The activity / inactivity and tap engines are evaluated sample by sample
+    whenever INT_SOURCE is read; their bits latch until that read.
+    """
+
+    REG_DEVID = 0x00
+    REG_THRESH_TAP = 0x1D
+    REG_DUR = 0x21
+    REG_LATENT = 0x22
+    REG_WINDOW = 0x23
+    REG_THRESH_ACT = 0x24
+    REG_THRESH_INACT = 0x25
+    REG_TIME_INACT = 0x26
+    REG_ACT_INACT_CTL = 0x27
+    REG_TAP_AXES = 0x2A
+    REG_BW_RATE = 0x2C
+    REG_POWER_CTL = 0x2D
+    REG_INT_ENABLE = 0x2E
+    REG_INT_SOURCE = 0x30
+    REG_DATA_FORMAT = 0x31
+    REG_DATAX0 = 0x32
+    REG_DATAZ1 = 0x37
+    REG_FIFO_CTL = 0x38
+    REG_FIFO_STATUS = 0x39
+
+    FIFO_DEPTH = 32
+
+    INT_DATA_READY = 0x80
+    INT_SINGLE_TAP = 0x40
+    INT_DOUBLE_TAP = 0x20
+    INT_ACTIVITY = 0x10
+    INT_INACTIVITY = 0x08
+    _MOTION_INTS = INT_ACTIVITY | INT_INACTIVITY
+    _TAP_INTS = INT_SINGLE_TAP | INT_DOUBLE_TAP
+
+    def __init__(self, hardware, address=0x53):
+        super().__init__(hardware, address)
+        self.regs = bytearray(0x40)
+        self.regs[self.REG_DEVID] = 0xE5
+        self.regs[self.REG_BW_RATE] = 0x0A       # 100 Hz
+        self._last_read_index = -1
+        self._latched = 0
+        self._motion_index = 0
+        self._act_ref = (0, 0, 0)
+        self._inact_ref = (0, 0, 0)
+        self._inact_since = 0
+        self._tap_index = 0
+        self._tap_start = None        # 当前超过阈值的脉冲从哪个样本开始
+        self._first_tap = None        # 等第二下时，第一下结束的样本
+        self._samples = {}            # index -> counts；几个引擎回看同一段样本时结果一致
+
+    @property
+    def data_rate_hz(self):
+        code = self.regs[self.REG_BW_RATE] & 0x0F
+        return 3200.0 / (1 << (15 - code))
+
+    def lsb_per_g(self):
+        fmt = self.regs[self.REG_DATA_FORMAT]
+        if fmt & 0x08:                          # FULL_RES
+            return 256.0
+        return 256.0 / (1 << (fmt & 0x03))
+
+    def _limit(self):
+        fmt = self.regs[self.REG_DATA_FORMAT]
+        if fmt & 0x08:
+            return (1 << (9 + (fmt & 0x03))) - 1
+        return 511
+
+    def current_index(self):
+        return int(self.hw.clock.now * self.data_rate_hz)
+
+    def counts_at(self, index):
+        """Raw int16 counts of the sample with the given output-data-rate index."""
+        counts = self._samples.get(index)
+        if counts is None:
+            t = index / self.data_rate_hz
+            scale = self.lsb_per_g() / STANDARD_GRAVITY
+            lim = self._limit()
+            counts = tuple(
+                max(-lim - 1, min(lim, int(round(v * scale))))
+                for v in self.hw.accel.sample(t)
+            )
+            if len(self._samples) > 1024:
+                self._samples = {i: c for i, c in self._samples.items() if i > index - 512}
+            self._samples[index] = counts
+        return counts
+
+    def fifo_mode(self):
+        return self.regs[self.REG_FIFO_CTL] >> 6
+
+    def fifo_entries(self):
+        if not self.fifo_mode():
+            return 0
+        return max(0, min(self.FIFO_DEPTH, self.current_index() - self._last_read_index))
+
+    def _next_index(self):
+        index = self.current_index()
+        if self.fifo_mode() and index > self._last_read_index:
+            # 取最老的未读样本；流模式下更老的已经被覆盖
+            index = max(self._last_read_index + 1, index - self.FIFO_DEPTH + 1)
+        return index
+
+    def _fifo_status(self):
+        entries = self.fifo_entries()
+        status = entries
+        if entries > (self.regs[self.REG_FIFO_CTL] & 0x1F):
+            status |= 0x80                      # FIFO_TRIG (watermark)
+        return status
+
+    def _rearm_motion(self):
+        index = self.current_index()
+        counts = self.counts_at(index)
+        self._act_ref = counts
+        self._inact_ref = counts
+        self._inact_since = index
+        self._motion_index = index
+
+    @staticmethod
+    def _axes(bits):
+        return (bits & 0x4, bits & 0x2, bits & 0x1)   # X, Y, Z enable
+
+    def _rearm_taps(self):
+        self._tap_index = self.current_index()
+        self._tap_start = None
+        self._first_tap = None
+
+    def _update_taps(self):
+        enabled = self.regs[self.REG_INT_ENABLE] & self._TAP_INTS
+        if not enabled:
+            return
+        rate = self.data_rate_hz
+        lim = self.regs[self.REG_THRESH_TAP] * 0.0625 * self.lsb_per_g()
+        max_len = self.regs[self.REG_DUR] * 625e-6 * rate
+        latent = self.regs[self.REG_LATENT] * 1.25e-3 * rate
+        window = self.regs[self.REG_WINDOW] * 1.25e-3 * rate
+        axes = self._axes(self.regs[self.REG_TAP_AXES])
+
+        current = self.current_index()
+        first = max(self._tap_index + 1, current - int(2 * rate))
+        for index in range(first, current + 1):
+            counts = self.counts_at(index)
+            above = any(on and abs(c) > lim for on, c in zip(axes, counts))
+            if self._first_tap is not None and index - self._first_tap > latent + window:
+                self._first_tap = None
+            if above:
+                if self._tap_start is None:
+                    self._tap_start = index
+                continue
+            if self._tap_start is None:
+                continue
+            start, self._tap_start = self._tap_start, None
+            if index - start > max_len:
+                continue                         # 太长，不算敲击
+            prev = self._first_tap
+            if prev is not None and start - prev >= latent:
+                self._latched |= self.INT_DOUBLE_TAP & enabled
+                self._first_tap = None
+            else:
+                self._latched |= self.INT_SINGLE_TAP & enabled
+                self._first_tap = index
+        self._tap_index = current
+
+    def _update_motion(self):
+        enabled = self.regs[self.REG_INT_ENABLE] & self._MOTION_INTS
+        if not enabled:
+            return
+        ctl = self.regs[self.REG_ACT_INACT_CTL]
+        step = 0.0625 * self.lsb_per_g()                # 62.5 mg per threshold LSB
+        act_lim = self.regs[self.REG_THRESH_ACT] * step
+        inact_lim = self.regs[self.REG_THRESH_INACT] * step
+        hold = max(1, self.regs[self.REG_TIME_INACT]) * self.data_rate_hz
+        act_axes = self._axes(ctl >> 4)
+        inact_axes = self._axes(ctl)
+        act_ac = ctl & 0x80
+        inact_ac = ctl & 0x08
+
+        current = self.current_index()
+        # 很久没读的话只回看最近 2 秒的样本
+        first = max(self._motion_index + 1, current - int(2 * self.data_rate_hz))
+        for index in range(first, current + 1):
+            counts = self.counts_at(index)
+            if enabled & self.INT_ACTIVITY:
+                ref = self._act_ref if act_ac else (0, 0, 0)
+                for on, c, r in zip(act_axes, counts, ref):
+                    if on and abs(c - r) > act_lim:
+                        self._latched |= self.INT_ACTIVITY
+                        break
+            if enabled & self.INT_INACTIVITY:
+                ref = self._inact_ref if inact_ac else (0, 0, 0)
+                quiet = all(not on or abs(c - r) < inact_lim
+                            for on, c, r in zip(inact_axes, counts, ref))
+                if not quiet:
+                    self._inact_since = index
+                    if inact_ac:
+                        self._inact_ref = counts
+                elif index - self._inact_since >= hold:
+                    self._latched |= self.INT_INACTIVITY
+                    self._inact_since = index
+        self._motion_index = current
+
+    def _int_source(self):
+        src = 0
+        if self.current_index() > self._last_read_index:
+            src |= self.INT_DATA_READY
+        self._update_motion()
+        self._update_taps()
+        src |= self._latched
+        self._latched = 0
+        return src
+
+    def write(self, data):
+        if not data:
+            return
+        self.pointer = data[0] & 0x3F
+        for b in data[1:]:
+            reg = self.pointer
+            if reg == self.REG_FIFO_CTL and (b >> 6) != self.fifo_mode():
+                # 换模式（尤其是进 bypass）会清空 FIFO
+                self._last_read_index = self.current_index()
+            elif reg == self.REG_ACT_INACT_CTL or reg == self.REG_INT_ENABLE:
+                # 启用引擎或改 AC/DC 设置时重新取参考值
+                new = b & ~self.regs[reg] if reg == self.REG_INT_ENABLE else self._MOTION_INTS
+                self.regs[reg] = b
+                if new & self._MOTION_INTS:
+                    self._rearm_motion()
+                if new & self._TAP_INTS:
+                    self._rearm_taps()
+            if self.pointer not in (self.REG_DEVID, self.REG_INT_SOURCE,
+                                    self.REG_FIFO_STATUS):
+                self.regs[self.pointer] = b
+            self.pointer = (self.pointer + 1) & 0x3F
+
+    def read(self, n):
+        out = bytearray(n)
+        snapshot = None
+        for i in range(n):
+            reg = self.pointer
+            if reg == self.REG_INT_SOURCE:
+                out[i] = self._int_source()
+            elif reg == self.REG_FIFO_STATUS:
+                out[i] = self._fifo_status()
+            elif self.REG_DATAX0 <= reg <= self.REG_DATAZ1:
+                if snapshot is None:
+                    index = self._next_index()
+                    counts = self.counts_at(index)
+                    snapshot = b"".join(
+                        (c & 0xFFFF).to_bytes(2, "little") for c in counts
+                    )
+                    self._last_read_index = index
+                out[i] = snapshot[reg - self.REG_DATAX0]
+            else:
+                out[i] = self.regs[reg]
+            self.pointer = (self.pointer + 1) & 0x3F
+        return bytes(out)
+
+
+class Ssd1306Device(I2CDevice):
+    """Only counts what is sent to the OLED; pixels come from displayio fakes."""
+
+
+class Frame:
+    """One captured display refresh."""
+
+    COLS = 21    # terminalio.FONT is 6 px wide
+    ROWS = 8     # rows of 8 px
+
+    def __init__(self, t, width, height, labels, tiles):
+        self.t = t
+        self.width = width
+        self.height = height
+        self.labels = labels      # [(x, y, text)]
+        self.tiles = tiles        # [(x, y, bitmap, palette)]
+
+    @property
+    def texts(self):
+        return [text for _, _, text in self.labels if text]
+
+    def _paint_tiles(self, fb):
+        w, h = self.width, self.height
+        for tx, ty, bitmap, palette in self.tiles:
+            for bx in range(bitmap.width):
+                px = tx + bx
+                if not 0 <= px < w:
+                    continue
+                for by in range(bitmap.height):
+                    py = ty + by
+                    if 0 <= py < h and palette[bitmap[bx, by]]:
+                        fb[py * w + px] = 1
+
+    def pixels(self):
+        """1 byte per pixel framebuffer; labels are drawn as 5x7 glyph boxes."""
+        w, h = self.width, self.height
+        fb = bytearray(w * h)
+        self._paint_tiles(fb)
+        for lx, ly, text in self.labels:
+            for i, ch in enumerate(text):
+                if ch == " ":
+                    continue
+                for gx in range(5):
+                    px = lx + i * 6 + gx
+                    if not 0 <= px < w:
+                        continue
+                    for gy in range(7):
+                        py = ly - 4 + gy
+                        if 0 <= py < h:
+                            fb[py * w + px] = 1
+        return fb
+
+    def ascii(self):
+        """Text rendering: label characters on a 21x8 grid, bitmaps as '#'."""
+        grid = [[" "] * self.COLS for _ in range(self.ROWS)]
+        fb = bytearray(self.width * self.height)
+        self._paint_tiles(fb)
+        for row in range(self.ROWS):
+            for col in range(self.COLS):
+                x0, y0 = col * 6, row * 8
+                if any(fb[y * self.width + x]
+                       for y in range(y0, min(y0 + 8, self.height))
+                       for x in range(x0, min(x0 + 6, self.width))):
+                    grid[row][col] = "#"
+        for lx, ly, text in self.labels:
+            row = ly // 8
+            if not 0 <= row < self.ROWS:
+                continue
+            for i, ch in enumerate(text):
+                col = (lx + i * 6) // 6
+                if 0 <= col < self.COLS:
+                    grid[row][col] = ch
+        border = "+" + "-" * self.COLS + "+"
+        return "\n".join([border] + ["|" + "".join(r) + "|" for r in grid] + [border])
+
+
+class Hardware:
+    """Everything the simulated board knows about its peripherals."""
+
+    PIN_NAMES = (
+        "D0", "D1", "D2", "D3", "D4", "D5", "D6", "D7", "D8", "D9", "D10",
+        "A0", "A1", "A2", "A3", "SCL", "SDA", "TX", "RX",
+    )
+
+    def __init__(self, *, seed=0, end_time=None, has_rotaryio=False, uptime=0.0):
+        self.clock = VirtualClock(uptime=uptime)
+        self.end_time = end_time
+        self.pins = {name: True for name in self.PIN_NAMES}
+        self.pin_watchers = {}        # pin name -> [callback()] on level change
+        # the Xiao ESP32-C3 has no PCNT, so its CircuitPython has no rotaryio
+        self.has_rotaryio = has_rotaryio
+
+        self.accel = AccelModel(seed=seed)
+        self.i2c_devices = {}
+        self.i2c_stats = {}           # address -> [transactions, bytes, bus seconds]
+        self.add_i2c_device(Adxl345Device(self))
+        self.add_i2c_device(Ssd1306Device(self, 0x3C))
+
+        self.display = None           # set by the fake SSD1306 driver
+        self.display_dirty = True
+        self.label_writes = 0         # Label.text assignments (each one re-lays out glyphs)
+        self.frames = []
+        self.max_frames = 2000
+
+        self.pixel_writes = 0
+        self.pixel_log = []           # (t, colors) on every color change
+        self.tone_log = []            # (t, frequency, duty_cycle)
+        self.serial_rx = ""           # typed into the serial console, not yet read
+
+        self.sleep_calls = 0
+        self._events = []             # heap of (t, seq, callback)
+        self._seq = 0
+        self.listeners = []           # callback(now) after every sleep
+
+    # ----- pins -----
+    def pin_level(self, name):
+        return self.pins.get(name, True)
+
+    def set_pin(self, name, level):
+        level = bool(level)
+        if self.pins.get(name) == level:
+            return
+        self.pins[name] = level
+        for callback in self.pin_watchers.get(name, ()):
+            callback()
+
+    def watch_pin(self, name, callback):
+        self.pin_watchers.setdefault(name, []).append(callback)
+
+    # ----- I2C -----
+    def add_i2c_device(self, device):
+        self.i2c_devices[device.address] = device
+        self.i2c_stats[device.address] = [0, 0, 0.0]
+
+    def i2c_count(self, address, nbytes, frequency=None, starts=1):
+        """Record a transaction; with a frequency the bus time also passes on the clock."""
+        stats = self.i2c_stats.setdefault(address, [0, 0, 0.0])
+        stats[0] += 1
+        stats[1] += nbytes
+        if frequency:
+            # 每个字节 9 个时钟（含 ACK），每次 START 还要发一个地址字节
+            seconds = (nbytes + starts) * 9 / frequency
+            stats[2] += seconds
+            self.clock.advance(seconds)
+
+    # ----- serial console -----
+    def serial_type(self, text):
+        self.serial_rx += text
+
+    def serial_read(self, n):
+        data, self.serial_rx = self.serial_rx[:n], self.serial_rx[n:]
+        return data
+
+    # ----- display -----
+    def capture_frame(self, frame):
+        self.frames.append(frame)
+        if len(self.frames) > self.max_frames:
+            del self.frames[: len(self.frames) - self.max_frames]
+
+    # ----- time -----
+    def schedule(self, t, callback):
+        heapq.heappush(self._events, (t, self._seq, callback))
+        self._seq += 1
+
+    def run_due_events(self):
+        now = self.clock.now
+        while self._events and self._events[0][0] <= now:
+            _, _, callback = heapq.heappop(self._events)
+            callback()
+
+    def sleep(self, seconds):
+        """Fake ``time.sleep``: move the virtual clock and let the world react."""
+        self.sleep_calls += 1
+        self.clock.advance(seconds)
+        self.run_due_events()
+        now = self.clock.now
+        for listener in self.listeners:
+            listener(now)
+        if self.end_time is not None and now >= self.end_time:
+            raise SimulationEnd()
@@ -0,0 +1,187 @@
+"""Runs ``src/code.py`` unmodified against the simulated hardware."""
+
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time as _real_time
+
+from sim import hardware as _hardware
+from sim.autoplay import AutoPlayer
+from sim.clock import SimulationEnd, patched_time
+from sim.trace import apply_trace, load_trace
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(SIM_DIR)
+FAKES_DIR = os.path.join(SIM_DIR, "fakes")
+LIB_DIR = os.path.join(REPO_ROOT, "lib")
+CODE_PATH = os.path.join(REPO_ROOT, "src", "code.py")
+
+
+class SimResult:
+    """What happened during one simulated run."""
+
+    def __init__(self, hardware, game_globals, wall_seconds, state_counts,
+                 transitions, serial_output, autoplayer):
+        self.hardware = hardware
+        self.game = game_globals
+        self.virtual_seconds = hardware.clock.now
+        self.wall_seconds = wall_seconds
+        self.iterations = hardware.sleep_calls
+        self.state_counts = state_counts      # state name -> loop passes
+        self.transitions = transitions        # [(t, state name)]
+        self.serial_output = serial_output
+        self.autoplayer = autoplayer
+
+    @property
+    def frames(self):
+        return self.hardware.frames
+
+    @property
+    def speedup(self):
+        if self.wall_seconds <= 0:
+            return float("inf")
+        return self.virtual_seconds / self.wall_seconds
+
+    def summary(self):
+        hw = self.hardware
+        lines = [
+            "virtual {:.2f} s in {:.2f} s wall ({:.1f}x real time), {} loop passes".format(
+                self.virtual_seconds, self.wall_seconds, self.speedup, self.iterations),
+            "states: " + ", ".join(
+                "{}={}".format(name, n) for name, n in self.state_counts.items()),
+            "path: " + " -> ".join(name for _, name in self.transitions),
+            "frames captured: {}, label text writes: {}, pixel writes: {}, tone changes: {}".format(
+                len(hw.frames), hw.label_writes, hw.pixel_writes, len(hw.tone_log)),
+        ]
+        for addr in sorted(hw.i2c_stats):
+            n, nbytes, busy = hw.i2c_stats[addr]
+            lines.append("i2c 0x{:02X}: {} transactions, {} bytes, {:.1f} ms on the bus ({:.1f}%)".format(
+                addr, n, nbytes, busy * 1000, 100 * busy / max(hw.clock.now, 1e-9)))
+        if self.game.get("score") is not None:
+            lines.append("score: {}".format(self.game["score"]))
+        return "\n".join(lines)
+
+
+def _state_names(game_globals):
+    names = {}
+    for key, value in game_globals.items():
+        if key.startswith("STATE_") and isinstance(value, int):
+            names[value] = key[len("STATE_"):]
+    return names
+
+
+def run(seconds=30.0, *, trace=None, autoplay=True, difficulty=0, reaction=0.25,
+        seed=0, settings=None, rotaryio=False, uptime=0.0, code_path=CODE_PATH,
+        workdir=None, echo=False):
+    """Run the game for ``seconds`` of virtual time and return a SimResult.
+
+    - trace: path of a trace file, or a list of (t, action, args) entries
+    - autoplay: let AutoPlayer drive the inputs from what is on screen
+    - difficulty: 0/1/2 menu choice used by the autoplayer
+    - reaction: autoplayer reaction time in seconds (slow bots lose levels)
+    - seed: seeds both the game's ``random`` and the sensor noise
+    - settings: {name: value} visible to os.getenv(), like settings.toml
+    - rotaryio: pretend the port has rotaryio (the real ESP32-C3 does not)
+    - uptime: seconds the board has already been on when the game starts;
+      time.monotonic() / ticks_ms() begin there (see VirtualClock)
+    - workdir: where highscores.txt lives (a temporary directory by default)
+    - echo: also copy the game's print() output to the real stdout
+    """
+    hw = _hardware.Hardware(seed=seed, end_time=seconds, has_rotaryio=rotaryio,
+                            uptime=uptime)
+    _hardware.activate(hw)
+
+    if trace is not None:
+        entries = load_trace(trace) if isinstance(trace, str) else trace
+        apply_trace(hw, entries)
+    player = None
+    if autoplay:
+        player = AutoPlayer(hw, difficulty=difficulty, reaction=reaction)
+        hw.listeners.append(player)
+
+    game = {"__name__": "__main__", "__file__": code_path}
+    state_counts = {}
+    transitions = []
+    names = {}
+
+    def track_state(now):
+        state = game.get("state")
+        if state is None:
+            return
+        if not names:
+            names.update(_state_names(game))
+        name = names.get(state, str(state))
+        state_counts[name] = state_counts.get(name, 0) + 1
+        if not transitions or transitions[-1][1] != name:
+            transitions.append((now, name))
+
+    hw.listeners.append(track_state)
+
+    with open(code_path) as f:
+        code = compile(f.read(), code_path, "exec")
+
+    saved_modules = set(sys.modules)
+    saved_path = list(sys.path)
+    saved_cwd = os.getcwd()
+    saved_stdin = sys.stdin
+    saved_env = dict(os.environ)
+    serial = io.StringIO()
+    out = serial if not echo else _Tee(serial, sys.stdout)
+    tmp = None
+    if workdir is None:
+        tmp = tempfile.TemporaryDirectory(prefix="diffuser-sim-")
+        workdir = tmp.name
+
+    random.seed(seed)
+    start = _real_time.perf_counter()
+    try:
+        sys.path[:0] = [FAKES_DIR, LIB_DIR, REPO_ROOT]
+        os.chdir(workdir)
+        os.environ.update({k: str(v) for k, v in (settings or {}).items()})
+        sys.stdin = _SerialIn(hw)
+        with patched_time(hw), contextlib.redirect_stdout(out):
+            try:
+                exec(code, game)
+            except SimulationEnd:
+                pass
+    finally:
+        wall = _real_time.perf_counter() - start
+        os.chdir(saved_cwd)
+        sys.path[:] = saved_path
+        sys.stdin = saved_stdin
+        os.environ.clear()
+        os.environ.update(saved_env)
+        for name in set(sys.modules) - saved_modules:
+            del sys.modules[name]
+        if tmp is not None:
+            tmp.cleanup()
+
+    return SimResult(hw, game, wall, state_counts, transitions,
+                     serial.getvalue(), player)
+
+
+class _SerialIn:
+    """sys.stdin for the game: reads what the trace typed into the console."""
+
+    def __init__(self, hardware):
+        self._hw = hardware
+
+    def read(self, n=-1):
+        return self._hw.serial_read(len(self._hw.serial_rx) if n < 0 else n)
+
+
+class _Tee:
+    def __init__(self, *streams):
+        self._streams = streams
+
+    def write(self, s):
+        for stream in self._streams:
+            stream.write(s)
+        return len(s)
+
+    def flush(self):
+        for stream in self._streams:
+            stream.flush()
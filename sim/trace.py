@@ -0,0 +1,160 @@
+"""Scripted input traces: encoder turns, button presses and accelerometer motion.
+
+A trace file has one event per line, ``<time_s> <action> [args...]``::
+
+    # t      action
+    3.4      press               # 80 ms press of the encoder button
+    4.0      press 0.8           # hold for 0.8 s
+    4.5      press 0.08 0        # a clean press, without contact bounce
+    5.0      dial 2              # two detents clockwise (negative = CCW)
+    6.0      shake 0.5           # shake for 0.5 s, then hold still
+    7.0      still
+    8.0      gravity 0 4.9 8.5   # new gravity vector in m/s^2
+    8.5      tilt left 0.8       # lean left/right/forward/back, back to level after 0.8 s
+    8.8      tap 2               # two taps on the box, 0.15 s apart
+    9.0      serial p            # type "p" into the serial console
+"""
+
+import math
+
+# 接线见 README 的 Circuit 一节
+ENCODER_PINS = ("D0", "D1")   # CLK, DT
+BUTTON_PIN = "D2"
+
+# 静止时两脚都被上拉为 1（q = A<<1 | B = 3），一个 detent 走完一整个格雷码周期
+_CW_STEPS = ((True, False), (False, False), (False, True), (True, True))
+_CCW_STEPS = ((False, True), (False, False), (True, False), (True, True))
+
+DEFAULT_PRESS_S = 0.08
+DEFAULT_BOUNCES = 3           # 按下 / 松开时触点抖这么多次
+BOUNCE_S = 0.0015             # 每次抖动的间隔
+DEFAULT_EDGE_S = 0.025        # > 2x the encoder debounce plus one loop pass
+DEFAULT_TILT_S = 0.8
+DEFAULT_TAP_GAP_S = 0.15
+TILT_ANGLE_DEG = 35.0
+
+# 倾斜方向 → 重力在 X / Y 上的符号（和游戏里 TILT L/R/F/B 的约定一致）
+TILT_AXES = {
+    "left": (-1, 0),
+    "right": (1, 0),
+    "forward": (0, 1),
+    "back": (0, -1),
+}
+
+
+class Actions:
+    """Schedules physical input on the simulated hardware."""
+
+    def __init__(self, hardware):
+        self.hw = hardware
+
+    def press(self, t, hold=DEFAULT_PRESS_S, bounces=DEFAULT_BOUNCES):
+        hw = self.hw
+        # 机械触点：每次变化前先来回抖几下，最后才稳定在新电平
+        for start, level in ((t, False), (t + hold, True)):
+            for i in range(2 * int(bounces) + 1):
+                hw.schedule(start + i * BOUNCE_S,
+                            lambda v=(level if i % 2 == 0 else not level): hw.set_pin(BUTTON_PIN, v))
+        return t + hold
+
+    def dial(self, t, detents=1, edge_interval=DEFAULT_EDGE_S):
+        hw = self.hw
+        steps = _CW_STEPS if detents > 0 else _CCW_STEPS
+        pin_a, pin_b = ENCODER_PINS
+        for _ in range(abs(int(detents))):
+            for a, b in steps:
+                t += edge_interval
+
+                def edge(a=a, b=b):
+                    hw.set_pin(pin_a, a)
+                    hw.set_pin(pin_b, b)
+
+                hw.schedule(t, edge)
+        return t + edge_interval
+
+    def still(self, t):
+        hw = self.hw
+        hw.schedule(t, lambda: hw.accel.set_still(hw.clock.now))
+        return t
+
+    def shake(self, t, duration=None):
+        hw = self.hw
+        hw.schedule(t, lambda: hw.accel.set_shake(hw.clock.now))
+        if duration is None:
+            return t
+        return self.still(t + duration)
+
+    def gravity(self, t, x, y, z):
+        hw = self.hw
+        hw.schedule(t, lambda: hw.accel.set_gravity(x, y, z))
+        return t
+
+    def tilt(self, t, direction, hold=DEFAULT_TILT_S):
+        hw = self.hw
+        sx, sy = TILT_AXES[str(direction).lower()]
+        g = 9.80665
+        side = g * math.sin(math.radians(TILT_ANGLE_DEG))
+        up = g * math.cos(math.radians(TILT_ANGLE_DEG))
+        saved = []
+
+        def lean():
+            saved.append(hw.accel.gravity)
+            hw.accel.set_gravity(sx * side, sy * side, up)
+
+        def level():
+            hw.accel.set_gravity(*saved.pop())
+
+        hw.schedule(t, lean)
+        hw.schedule(t + hold, level)
+        return t + hold
+
+    def tap(self, t, count=2, gap=DEFAULT_TAP_GAP_S):
+        hw = self.hw
+        for i in range(int(count)):
+            hw.accel.add_tap(t + i * gap)
+        return t + (int(count) - 1) * gap + hw.accel.tap_s
+
+    def serial(self, t, *words):
+        hw = self.hw
+        text = " ".join(str(w) for w in words)
+        hw.schedule(t, lambda: hw.serial_type(text))
+        return t
+
+
+def _arg(text):
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def parse_trace(lines):
+    """Parse trace text into [(t, action, [args])]; numeric args become floats."""
+    entries = []
+    for lineno, line in enumerate(lines, 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        parts = line.split()
+        if len(parts) < 2:
+            raise ValueError("line {}: expected '<time> <action> [args]'".format(lineno))
+        try:
+            t = float(parts[0])
+        except ValueError:
+            raise ValueError("line {}: bad time in {!r}".format(lineno, line)) from None
+        entries.append((t, parts[1].lower(), [_arg(a) for a in parts[2:]]))
+    return entries
+
+
+def load_trace(path):
+    with open(path) as f:
+        return parse_trace(f)
+
+
+def apply_trace(hardware, entries):
+    actions = Actions(hardware)
+    for t, action, args in entries:
+        fn = getattr(actions, action, None)
+        if fn is None or action.startswith("_"):
+            raise ValueError("unknown trace action {!r}".format(action))
+        fn(t, *args)
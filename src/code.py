@@ -1,19 +1,40 @@
+import os
 import time
-import math
 import random
 
 import board
 import busio
 import displayio
 import terminalio
-import digitalio
 
 from adafruit_display_text import label
 import i2cdisplaybus
 import adafruit_displayio_ssd1306
-import adafruit_adxl34x
 
-from rotary_encoder import RotaryEncoder
+from ticks import ticks_ms, ticks_diff, to_ms
+from rotary_encoder import make_encoder
+from buttons import make_button
+from sfx import ToneSequencer
+from pixel_fx import PixelAnimator
+from frame_pacer import FramePacer
+from bus_scheduler import BusScheduler
+from adxl345_fifo import Adxl345Fifo, MS2_PER_COUNT
+from filters import (
+    Pipeline, Offset, Ema, HighPass, DominantAxis, WindowVariance, Reversals,
+    X, Y, DIR_POS_X, DIR_NEG_X, DIR_POS_Y, DIR_NEG_Y,
+)
+from calibration import BaselineEstimator
+from adxl345_activity import Adxl345Activity, INT_ACTIVITY, INT_INACTIVITY, INT_DOUBLE_TAP
+from input_events import (
+    InputEvents,
+    EV_NONE, EV_DIAL_CW, EV_DIAL_CCW, EV_SHAKE, EV_STILL, EV_TILT, EV_TAP,
+    EV_LONG_PRESS, EV_MULTI_CLICK, EV_CLICK,
+)
+from loop_profiler import (
+    LoopProfiler,
+    SPAN_AUDIO, SPAN_ENCODER, SPAN_BUTTON, SPAN_RENDER, SPAN_ACCEL, SPAN_LOGIC,
+    SPAN_DISPLAY,
+)
 
 import neopixel
 
@@ -29,6 +50,16 @@ STATE_WAIT_INPUT  = 4   # 等玩家完成这一关命令序列
 STATE_LEVEL_RESULT = 5  # 显示结果（成功/失败）
 STATE_HS_SHOW     = 6   # 新：显示排行榜
 
+STATE_NAMES = (
+    "SPLASH", "NAME_INPUT", "MENU", "INIT_LEVEL",
+    "WAIT_INPUT", "LEVEL_RESULT", "HS_SHOW",
+)
+
+# ---------- 主循环性能分析（可选） ----------
+# settings.toml 里写 DIFFUSER_PROFILE = 1 打开；串口输入 p 打印直方图，r 清零
+PROFILE = str(os.getenv("DIFFUSER_PROFILE", 0)) not in ("0", "")
+profiler = LoopProfiler(STATE_NAMES) if PROFILE else None
+
 
 DIFFICULTIES = ["EASY", "MEDIUM", "HARD"]
 
@@ -44,6 +75,30 @@ MOVE_DIAL      = 0   # 旋转编码器
 MOVE_CUT_WIRE  = 1   # 按按钮
 MOVE_STEADY    = 2   # 保持静止
 MOVE_SHAKE     = 3   # 摇一摇
+MOVE_TILT_LEFT    = 4   # 向左倾斜（-X）
+MOVE_TILT_RIGHT   = 5   # 向右倾斜（+X）
+MOVE_TILT_FORWARD = 6   # 向前倾斜（+Y）
+MOVE_TILT_BACK    = 7   # 向后倾斜（-Y）
+MOVE_DOUBLE_TAP   = 8   # 敲两下（ADXL345 硬件双击检测）
+
+# 倾斜命令 → 主导轴方向
+TILT_DIRECTION = {
+    MOVE_TILT_LEFT: DIR_NEG_X,
+    MOVE_TILT_RIGHT: DIR_POS_X,
+    MOVE_TILT_FORWARD: DIR_POS_Y,
+    MOVE_TILT_BACK: DIR_NEG_Y,
+}
+
+# 加速度命令 → 能完成它的事件；别的检测结果在这条命令期间不进队列
+MOTION_EVENT = {
+    MOVE_STEADY: EV_STILL,
+    MOVE_SHAKE: EV_SHAKE,
+    MOVE_TILT_LEFT: EV_TILT,
+    MOVE_TILT_RIGHT: EV_TILT,
+    MOVE_TILT_FORWARD: EV_TILT,
+    MOVE_TILT_BACK: EV_TILT,
+    MOVE_DOUBLE_TAP: EV_TAP,
+}
 
 def command_name(cmd):
     if cmd == MOVE_DIAL:
@@ -54,6 +109,17 @@ def command_name(cmd):
         return "STEADY"
     if cmd == MOVE_SHAKE:
         return "SHAKE"
+    # 屏幕一行只有 20 个字，名字要短
+    if cmd == MOVE_TILT_LEFT:
+        return "TILT L"
+    if cmd == MOVE_TILT_RIGHT:
+        return "TILT R"
+    if cmd == MOVE_TILT_FORWARD:
+        return "TILT F"
+    if cmd == MOVE_TILT_BACK:
+        return "TILT B"
+    if cmd == MOVE_DOUBLE_TAP:
+        return "TAP TAP"
     return "UNKNOWN"
 
 # ---------- Level 配置（按你原来的表） ----------
@@ -81,23 +147,36 @@ DIFF_RANGE = {
 }
 
 # ---------- Steady / Shake 检测参数 ----------
-STEADY_DIFF_THRESH = 0.4     # m/s^2，越小越严格
-STEADY_HOLD_TIME   = 0.6     # 秒，保持这么久才算成功
-SHAKE_DIFF_THRESH  = 6.0     # m/s^2，超过这个认为是摇动
+STEADY_DIFF_THRESH = 0.4     # m/s^2，窗口内的均方根抖动，越小越严格
+STEADY_HOLD_MS     = 600     # ms，保持这么久才算成功（也是方差窗口的长度，最多 64 个样本 = 100 Hz 下 640 ms）
+SHAKE_DIFF_THRESH  = 6.0     # m/s^2，高通后来回超过 ±这个值才算一次摆动
+SHAKE_REVERSALS    = 4       # 摆动换向这么多次……
+SHAKE_WINDOW_MS    = 500     # ……而且都在这么多 ms 内，才算摇
 
-# 低通滤波参数（为了过滤加速度噪声）
-FILTER_ALPHA = 0.4           # 0~1，越小越平滑
-filtered_diff = 0.0          # EMA 的初始值
+# ---------- Tilt 检测参数（同 accelerometer.py 的主导轴判断） ----------
+TILT_THRESH = 4.0            # m/s^2，相对基线约 24°
+TILT_ALPHA = 0.3             # 各轴 EMA
+TILT_REQUIRED_COUNT = 4      # 连续 4 个样本同一方向才算
+
+# 高通滤波参数（同 highpass filtering.py），越接近 1 截止频率越低（0.9 @100 Hz ≈ 1.8 Hz）
+SHAKE_HP_ALPHA = 0.9
+
+# 运行时全用整数：原始计数，阈值在这里先换算好
+STEADY_VAR_COUNTS2 = int((STEADY_DIFF_THRESH / MS2_PER_COUNT) ** 2 + 0.5)
+SHAKE_SWING_COUNTS = int(SHAKE_DIFF_THRESH / MS2_PER_COUNT + 0.5)
 
 # ---------- NeoPixel 设置 ----------
 NEOPIXEL_PIN = board.D7      # 把这个改成你接 NeoPixel 的引脚
 NUM_PIXELS   = 1             # 灯珠数量，改成你实际用的个数
 
-pixels = neopixel.NeoPixel(NEOPIXEL_PIN, NUM_PIXELS, brightness=0.3, auto_write=True)
+pixels = neopixel.NeoPixel(NEOPIXEL_PIN, NUM_PIXELS, brightness=0.3, auto_write=False)
 
 # 呼吸灯参数
-breathe_phase = 0.0          # 用来累积时间
 BREATHE_SPEED = 2.0          # 速度系数，越大呼吸越快
+PIXEL_FPS     = 50           # 灯效最多每秒刷新这么多次
+
+# 灯效交给 animator，主循环每次调用 pixel_fx.update()，颜色不变就不写灯珠
+pixel_fx = PixelAnimator(pixels, fps=PIXEL_FPS)
 
 # ---------- Buzzer 初始化 ----------
 BUZZER_PIN = board.D6  # 换成你实际接的引脚
@@ -109,16 +188,31 @@ buzzer = pwmio.PWMOut(
     variable_frequency=True
 )
 
+# 音效交给 sequencer 播放，主循环每次调用 sfx.update()，不会再 sleep
+sfx = ToneSequencer(buzzer, volume=0.3)
+
 # ---------- OLED 初始化 ----------
 displayio.release_displays()
 
-i2c = busio.I2C(board.SCL, board.SDA)
+# OLED 和 ADXL345 共用一条 I2C。两个都支持 400 kHz fast mode，整屏刷新的时间是 100 kHz 的 1/4
+I2C_FREQUENCY = int(os.getenv("DIFFUSER_I2C_HZ", 400000))
+i2c = busio.I2C(board.SCL, board.SDA, frequency=I2C_FREQUENCY)
+# 谁占了多久总线都记下来；等输入时传感器优先，屏幕刷新挪到两次读 FIFO 之间的空当
+bus = BusScheduler(I2C_FREQUENCY)
+if PROFILE:
+    profiler.add_reporter(bus.report)
 display_bus = i2cdisplaybus.I2CDisplayBus(i2c, device_address=0x3C)
 display = adafruit_displayio_ssd1306.SSD1306(display_bus, width=128, height=64)
 
 main_group = displayio.Group()
 display.root_group = main_group
 
+# 手动刷新：一次循环里的所有 label / TileGrid 改动攒起来，按 DISPLAY_FPS 统一推送
+DISPLAY_FPS = 25
+frame_pacer = FramePacer(display, fps=DISPLAY_FPS, bus=bus.client("display"))
+if PROFILE:
+    profiler.add_reporter(frame_pacer.report)
+
 status_label = label.Label(terminalio.FONT, text="", x=2, y=10)
 main_group.append(status_label)
 
@@ -161,52 +255,216 @@ main_group.append(splash_bar)
 
 
 # ---------- Rotary Encoder ----------
-encoder = RotaryEncoder(
+# "auto"：板子有 rotaryio（硬件计数）就用它，否则用 Python 轮询解码
+# settings.toml 里可以用 DIFFUSER_ENCODER = "polled" / "hardware" 强制指定
+ENCODER_BACKEND = os.getenv("DIFFUSER_ENCODER", "auto")
+
+encoder = make_encoder(
     board.D0,  # CLK
     board.D1,  # DT
+    backend=ENCODER_BACKEND,
     debounce_ms=6,
-    pulses_per_detent=3,
+    pulses_per_detent=4,
 )
-last_position = encoder.position
+if PROFILE:
+    profiler.add_reporter(encoder.report)
 
 # ---------- 按钮 ----------
-button = digitalio.DigitalInOut(board.D2)
-button.switch_to_input(pull=digitalio.Pull.UP)
-last_button_value = button.value
+# 去抖后的按钮：触点抖动不会变成两次点击（CUT WIRE 连着出现时很要命）
+# 短按的操作都在松手时（EV_CLICK）才算：按下那一刻还不知道会不会变成长按
+# "auto"：有 keypad 就让固件在后台扫描（主循环卡住时按下也不会丢），否则每圈轮询
+# settings.toml 里可以用 DIFFUSER_BUTTONS = "keypad" / "polled" 强制指定
+BUTTON_BACKEND = os.getenv("DIFFUSER_BUTTONS", "auto")
+BUTTON_DEBOUNCE_MS = 10
+BUTTON_CLICK_MS = 250        # 连按之间、每一下按住都不超过这么久才算双击
+BUTTON_LONG_MS = 1000        # 按住这么久 = 返回 / 放弃这一局
+
+button = make_button(
+    board.D2,
+    backend=BUTTON_BACKEND,
+    value_when_pressed=False,
+    debounce_ms=BUTTON_DEBOUNCE_MS,
+    short_duration_ms=BUTTON_CLICK_MS,
+    long_duration_ms=BUTTON_LONG_MS,
+)
+
+# ---------- 输入事件队列 ----------
+# 旋钮 / 按钮 / 加速度统一变成带时间戳的事件（DIAL+/-、CLICK、LONG、SHAKE、STILL …）
+# SHAKE / STILL / TILT / TAP 由下面的滤波级和 INT_SOURCE 决定，检测到就 push 进来
+inputs = InputEvents(encoder, button, size=32)
+
+def reset_motion():
+    """换命令时清掉动作检测的历史（硬件模式下下一帧重新 arm，取新的参考值）"""
+    global tap_cleared
+    inputs.drop_motion()   # 上一条命令那帧里多检测到的事件不能带到下一条
+    tilt_ema.reset()
+    tilt_axis.reset()
+    steady_var.reset()
+    shake_branch.reset()
+    # FIFO 里还没读的样本是上一条命令时采的，清掉，新的 STEADY 窗口从这里开始
+    if accel_fifo.streaming:
+        accel_fifo.flush()
+    tap_cleared = False
+    if motion_hw is not None:
+        motion_hw.disarm()
 
 # ---------- ADXL345 ----------
-accel = adafruit_adxl34x.ADXL345(i2c)
-
-baseline_x = 0.0
-baseline_y = 0.0
-baseline_z = 9.8
-
-def calibrate_baseline(samples=20, delay=0.01):
-    """简单求平均，作为当前姿态的基线"""
-    global baseline_x, baseline_y, baseline_z
-    sx = sy = sz = 0.0
-    for _ in range(samples):
-        x, y, z = accel.acceleration
-        sx += x
-        sy += y
-        sz += z
-        time.sleep(delay)
-    baseline_x = sx / samples
-    baseline_y = sy / samples
-    baseline_z = sz / samples
-
-def accel_diff_mag_filtered():
-    """返回经过简单低通滤波后的差值长度"""
-    global filtered_diff
-    x, y, z = accel.acceleration
-    dx = x - baseline_x
-    dy = y - baseline_y
-    dz = z - baseline_z
-    raw = math.sqrt(dx*dx + dy*dy + dz*dz)
-
-    # 一阶低通滤波：filtered = α*raw + (1-α)*prev
-    filtered_diff = FILTER_ALPHA * raw + (1.0 - FILTER_ALPHA) * filtered_diff
-    return filtered_diff
+# FIFO stream 模式：芯片按固定 ODR 采样存进 32 级 FIFO，主循环隔一段时间一次读空。
+# 只有 STEADY / SHAKE 命令和校准时才打开，其余时间是 bypass。
+# 芯片的设置（BW_RATE / FIFO_CTL / POWER_CTL、中断）都由 Adxl345Fifo / Adxl345Activity 自己写，
+# 不需要 adafruit_adxl34x 的驱动对象
+ACCEL_RATE_HZ = 100      # 输出数据率
+ACCEL_BATCH_MS = 40      # 最多每 40 ms 读一次 FIFO（约 4 个样本）
+accel_fifo = Adxl345Fifo(
+    i2c,
+    rate_hz=ACCEL_RATE_HZ,
+    batch_ms=ACCEL_BATCH_MS,
+    bus=bus.client("accel"),
+)
+if PROFILE:
+    profiler.add_reporter(accel_fifo.report)
+
+# STEADY / SHAKE 的检测方式：
+#   "software"：读 FIFO 样本，Python 里用滑动方差 / 高通换向计数判断
+#   "hardware"：把同样的阈值写进 ADXL345 的 activity / inactivity 引擎，
+#               每帧只读一个字节的 INT_SOURCE（阈值步长 0.61 m/s^2，静止时间按整秒）
+MOTION_DETECT = os.getenv("DIFFUSER_MOTION", "software")
+accel_ints = Adxl345Activity(
+    i2c,
+    shake_ms2=SHAKE_DIFF_THRESH,
+    still_ms2=STEADY_DIFF_THRESH,
+    still_s=STEADY_HOLD_MS / 1000,
+    bus=bus.client("accel"),
+)
+motion_hw = accel_ints if MOTION_DETECT == "hardware" else None
+
+# TAP TAP：双击交给芯片的 tap 引擎，开机配置一次，之后一直开着。
+# 结果锁存在 INT_SOURCE 里，和 activity / inactivity 共用同一个字节
+TAP_THRESHOLD = 20    # 62.5 mg/LSB → 1.25 g
+TAP_DURATION = 50     # 625 us/LSB → 一下最长 31 ms
+TAP_LATENCY = 20      # 1.25 ms/LSB → 两下之间至少 25 ms
+TAP_WINDOW = 255      # 1.25 ms/LSB → 第二下要在约 320 ms 内
+accel_ints.enable_double_tap(
+    threshold=TAP_THRESHOLD,
+    duration=TAP_DURATION,
+    latency=TAP_LATENCY,
+    window=TAP_WINDOW,
+)
+tap_cleared = False   # 本条命令开始时是否已经清掉了之前锁存的双击
+motion_wanted = EV_NONE   # 当前命令等的加速度事件（MOTION_EVENT），主循环每圈更新
+
+def push_motion(ev, now, value=0):
+    """检测结果 → 输入事件；不是当前命令要的就丢掉，免得留在队列里完成下一条命令"""
+    if ev == motion_wanted:
+        inputs.push(ev, now, value)
+
+def push_int_events(src, now):
+    """INT_SOURCE 的位 → 输入事件"""
+    if src & INT_ACTIVITY:
+        push_motion(EV_SHAKE, now)
+    if src & INT_INACTIVITY:
+        push_motion(EV_STILL, now)
+    if src & INT_DOUBLE_TAP:
+        push_motion(EV_TAP, now)
+
+# 基线是原始计数（256 count ≈ 1 g）
+baseline_x = 0
+baseline_y = 0
+baseline_z = 256
+
+# ---------- 后台校准 ----------
+# 不再每关阻塞 20 x 10 ms 去采样：关卡介绍那 1 秒里 FIFO 照常流数据，
+# 一边显示一边累计均值 / 方差；姿态没怎么变就沿用原来的基线
+BASELINE_TOLERANCE = 0.3     # m/s^2，新旧基线每个轴差这么多以内就不换
+BASELINE_TOL_COUNTS = int(BASELINE_TOLERANCE / MS2_PER_COUNT + 0.5)
+baseline_est = BaselineEstimator(window=64, min_samples=20, max_var=25)
+baseline_valid = False       # 开机后还没有校准过
+baseline_updates = 0
+baseline_reuses = 0
+
+def calibration_begin():
+    """开始一轮后台校准（选好难度 / 进入下一关时调用）"""
+    baseline_est.reset()
+    accel_fifo.flush()
+
+def calibration_feed(now):
+    """把 FIFO 里的新样本喂给估计器，不阻塞"""
+    n = accel_fifo.drain(now)
+    xs = accel_fifo.x
+    ys = accel_fifo.y
+    zs = accel_fifo.z
+    for i in range(n):
+        baseline_est.add(xs[i], ys[i], zs[i])
+
+def calibration_finish():
+    """关卡正式开始：采用新的基线，或者在姿态没变时保留旧的"""
+    global baseline_x, baseline_y, baseline_z, baseline_valid
+    global baseline_updates, baseline_reuses
+    mean = baseline_est.result()
+    if mean is None:
+        # 玩家一直在动，没有可信的估计：保留旧基线
+        baseline_reuses += 1
+        return
+    mx, my, mz = mean
+    if (baseline_valid
+            and abs(mx - baseline_x) <= BASELINE_TOL_COUNTS
+            and abs(my - baseline_y) <= BASELINE_TOL_COUNTS
+            and abs(mz - baseline_z) <= BASELINE_TOL_COUNTS):
+        baseline_reuses += 1
+        return
+    baseline_x = mx
+    baseline_y = my
+    baseline_z = mz
+    motion_offset.set(mx, my, mz)
+    baseline_valid = True
+    baseline_updates += 1
+
+def calibration_report(out=print):
+    out("baseline: ({}, {}, {}) counts, {} updates, {} reused, {} noisy windows".format(
+        baseline_x, baseline_y, baseline_z, baseline_updates, baseline_reuses,
+        baseline_est.rejected))
+
+if PROFILE:
+    profiler.add_reporter(calibration_report)
+
+# 每个 FIFO 样本只过一遍：减基线 → 三轴滑动方差（STEADY）→ 高通后数换向（SHAKE，
+# 分支里做，不改动主帧）→ X/Y 做 EMA 找主导轴（倾斜方向）。所有检测共用一次 FIFO 读取
+motion_offset = Offset(baseline_x, baseline_y, baseline_z)
+# STEADY：最近 STEADY_HOLD_MS 的样本方差都够小才算静止，和基线、滤波历史都无关
+steady_var = WindowVariance(
+    STEADY_HOLD_MS * ACCEL_RATE_HZ // 1000,
+    STEADY_VAR_COUNTS2,
+)
+# SHAKE：高通去掉重力和慢慢的倾斜，只数来回摆动，不用校准、和朝向无关
+shake_swings = Reversals(
+    SHAKE_SWING_COUNTS,
+    count=SHAKE_REVERSALS,
+    window=SHAKE_WINDOW_MS * ACCEL_RATE_HZ // 1000,
+)
+shake_branch = Pipeline(HighPass(SHAKE_HP_ALPHA), shake_swings)
+tilt_ema = Ema(TILT_ALPHA, channels=(X, Y))
+tilt_axis = DominantAxis(
+    int(TILT_THRESH / MS2_PER_COUNT + 0.5),
+    count=TILT_REQUIRED_COUNT,
+    channels=(X, Y),
+)
+motion_chain = Pipeline(
+    motion_offset,
+    steady_var,
+    shake_branch,
+    tilt_ema,
+    tilt_axis,
+)
+
+def accel_update(now=None):
+    """
+    一次把 FIFO 里攒的样本全读出来，逐个过一遍 motion_chain，返回样本数；
+    FIFO 还没到读的时候返回 0。全程整数运算，不会每个样本都分配对象。
+    """
+    n = accel_fifo.drain(now)
+    if n:
+        motion_chain.push_batch(accel_fifo.x, accel_fifo.y, accel_fifo.z, n)
+    return n
 
 # ---------- Score ----------
 score = 0
@@ -222,20 +480,18 @@ highscores = []  # [{"name": "AAA", "score": 123}, ...]
 # ---------- 当前玩家名字（本次上电周期内一直使用） ----------
 player_initials = ["A", "A", "A"]   # 编辑用
 player_pos = 0                      # 当前在编辑第几位 (0/1/2)
-player_last_position = 0           # Rotary 在名字编辑状态下的 position 记录
 current_player_name = "AAA"        # 真正用于记分的名字
 
 # ---------- 新增：Splash 动画计时 ------------
-splash_start_time = 0.0
+# 所有计时都用 ticks_ms() 的整数毫秒，用 ticks_diff() 相减：
+# float 的 time.monotonic() 开机几个小时后就没有毫秒精度了
+splash_start_time = 0
 
 # 命令序列相关
 current_sequence = []        # [MOVE_...]
 required_commands = 0        # len(current_sequence)
 current_cmd_index = 0        # 正在执行的命令的 index
 
-# Steady 检测用
-steady_start_time = None     # 开始进入“足够稳定”的时间戳（用于累计）
-
 # ---------- 状态变量 ----------
 state = STATE_SPLASH          # 开机先进 Splash（正确）
 
@@ -248,77 +504,114 @@ selected_diff_index = 0        # 只在开始游戏时由 selected_menu_index 
 current_level_index = 0        # LEVELS 的 index
 current_level_num = 1
 
-# 默认 time_limit 用第一个关卡（但实际开始时会重新赋值）
-time_limit = LEVELS[0]["time_limit"]
+# 默认 time_limit 用第一个关卡（但实际开始时会重新赋值），换算成 ms
+time_limit_ms = to_ms(LEVELS[0]["time_limit"])
 
-level_start_time = 0.0
+level_start_time = 0
 result_is_success = False
 
+# HUD 缓存：play 画面上次画出来的内容，没变就不碰 label
+HUD_TIME_STEP_MS = 100         # 倒计时按 0.1s 量化
+hud_cmd_index = None           # None = 需要整屏重画
+hud_time_steps = -1
+hud_score = -1
+
 
 # -------- UI function --------
+def set_text(lbl, text):
+    """只有内容真的变化才赋值（每次赋值都会重新排版并让屏幕重刷）"""
+    if lbl.text != text:
+        lbl.text = text
+        frame_pacer.mark_dirty()
+
+def set_x(item, x):
+    if item.x != x:
+        item.x = x
+        frame_pacer.mark_dirty()
+
+def hud_invalidate():
+    """下一次 show_level_play() 整屏重画"""
+    global hud_cmd_index
+    hud_cmd_index = None
+
 def clear_menu():
     for lbl in menu_labels:
-        lbl.text = ""
+        set_text(lbl, "")
 
 def draw_menu(selected: int) -> None:
     clear_menu()
-    status_label.text = "Main Menu"
-    center_label.text = ""
+    set_text(status_label, "Main Menu")
+    set_text(center_label, "")
 
     pixels_solid((0, 0, 40))
 
     # 0: Player 行
     prefix = "> " if selected == 0 else "  "
-    menu_labels[0].text = prefix + "Player: {}".format(current_player_name)
+    set_text(menu_labels[0], prefix + "Player: {}".format(current_player_name))
 
     # 1~3: 难度行
     for i, name in enumerate(DIFFICULTIES):
         row_index = i + 1
         prefix = "> " if selected == row_index else "  "
-        menu_labels[row_index].text = prefix + name
+        set_text(menu_labels[row_index], prefix + name)
 
 
 def show_level_intro():
     clear_menu()
     diff_name = DIFFICULTIES[selected_diff_index]
-    status_label.text = "{}  Lv{}".format(diff_name, current_level_num)  # Show current score on the screen
-    center_label.text = "Cmds:{} Time:{:.1f}s  Score:{}".format(
-        required_commands, time_limit, score
-    )
+    set_text(status_label, "{}  Lv{}".format(diff_name, current_level_num))  # Show current score on the screen
+    set_text(center_label, "Cmds:{} Time:{:.1f}s  Score:{}".format(
+        required_commands, time_limit_ms / 1000, score
+    ))
 
     pixels_solid((0, 80, 0))
     
-def show_level_play(remaining: float):
-    clear_menu()
+def show_level_play(remaining_ms: int):
+    """每次循环都会调用，但只有看得见的内容变了才更新 label / 灯"""
+    global hud_cmd_index, hud_time_steps, hud_score
     cmd_idx = current_cmd_index
-    cmd = current_sequence[cmd_idx]
-    cmd_text = command_name(cmd)
-
-    status_label.text = "Lv{} {}/{} {:.1f}s".format(
+    if remaining_ms > 0:
+        steps = (remaining_ms + HUD_TIME_STEP_MS // 2) // HUD_TIME_STEP_MS
+    else:
+        steps = 0
+    if cmd_idx == hud_cmd_index and steps == hud_time_steps and score == hud_score:
+        return
+
+    if hud_cmd_index is None:
+        clear_menu()
+    hud_time_steps = steps
+    tenths = steps * HUD_TIME_STEP_MS // 100
+    set_text(status_label, "Lv{} {}/{} {}.{}s".format(
         current_level_num,
         cmd_idx + 1,
         required_commands,
-        max(0, remaining),
-    )
-    center_label.text = "{}  Score:{}".format(cmd_text, score)
+        tenths // 10,
+        tenths % 10,
+    ))
+
+    if cmd_idx != hud_cmd_index or score != hud_score:
+        hud_cmd_index = cmd_idx
+        hud_score = score
+        cmd = current_sequence[cmd_idx]
+        set_text(center_label, "{}  Score:{}".format(command_name(cmd), score))
 
-    # 🔵 不同动作不同颜色
-    pixels_for_command(cmd)
+        # 🔵 不同动作不同颜色
+        pixels_for_command(cmd)
 
 def show_level_result(success: bool, is_last_level: bool):
     clear_menu()
     if success:
         if is_last_level:
-            status_label.text = "YOU WIN!"
-            center_label.text = "Score: {}".format(score)
+            set_text(status_label, "YOU WIN!")
+            set_text(center_label, "Score: {}".format(score))
             pixels_flash((0, 255, 0), times=4, delay=0.1)
         else:
-            status_label.text = "Level {} Clear!".format(current_level_num)
-            center_label.text = "Score: {}".format(score)
+            set_text(status_label, "Level {} Clear!".format(current_level_num))
+            set_text(center_label, "Score: {}".format(score))
             pixels_flash((0, 255, 0), times=2, delay=0.1)
     else:
-        status_label.text = "GAME OVER"
-        center_label.text = "Score: {}".format(score)
+        set_text(status_label, "GAME OVER")
+        set_text(center_label, "Score: {}".format(score))
         pixels_flash((255, 0, 0), times=3, delay=0.1)
 
 def generate_sequence_for_level(level_cfg):
@@ -326,7 +619,11 @@ def generate_sequence_for_level(level_cfg):
     n = level_cfg["commands"]
 
     # 动作池：按难度控制复杂度
-    ALL_MOVES   = [MOVE_CUT_WIRE, MOVE_DIAL, MOVE_STEADY, MOVE_SHAKE]
+    ALL_MOVES   = [
+        MOVE_CUT_WIRE, MOVE_DIAL, MOVE_STEADY, MOVE_SHAKE,
+        MOVE_TILT_LEFT, MOVE_TILT_RIGHT, MOVE_TILT_FORWARD, MOVE_TILT_BACK,
+        MOVE_DOUBLE_TAP,
+    ]
 
     seq = []
     for _ in range(n):
@@ -336,88 +633,93 @@ def generate_sequence_for_level(level_cfg):
 # High score ranking
 def show_highscore_board():
     clear_menu()
-    status_label.text = "HIGH SCORES"
+    set_text(status_label, "HIGH SCORES")
 
     # 显示前 3 名
     for i, entry in enumerate(highscores[:3]):
         name = entry["name"]
         s = entry["score"]
-        menu_labels[i].text = "{}. {}  {}".format(i + 1, name, s)
+        set_text(menu_labels[i], "{}. {}  {}".format(i + 1, name, s))
 
     # 不再用 center_label 作为提示
-    center_label.text = ""
+    set_text(center_label, "")
 
     # 把提示放到最下面
-    menu_labels[2].text = "Press → Menu"
+    set_text(menu_labels[2], "Press → Menu")
 
 
 # ---------- Buzzer 工具函数 ----------
+# 音符表：(频率Hz, 时长s)，频率 0 表示休止
+
+SFX_STARTUP_MARIO = (
+    (660, 0.10), (0, 0.04),   # E5
+    (660, 0.10), (0, 0.04),   # E5 again
+    (660, 0.10), (0, 0.10),   # E5 again
+    (510, 0.10), (0, 0.04),   # C5
+    (660, 0.10), (0, 0.04),   # E5
+    (770, 0.12),              # G5 (Mario trademark upward!)
+)
+
+SFX_MOVE_OK = (
+    (1400, 0.05),
+)
+
+SFX_LEVEL_CLEAR = (
+    (800, 0.08), (0, 0.03),
+    (1000, 0.08), (0, 0.03),
+    (1300, 0.1),
+)
+
+SFX_GAME_OVER = (
+    (600, 0.12), (0, 0.04),
+    (400, 0.18),
+)
+
+SFX_GAME_WIN = (
+    (900, 0.08), (0, 0.03),
+    (1200, 0.08), (0, 0.03),
+    (1500, 0.12),
+)
 
 def sfx_startup_mario():
     """马里奥风格开机音效（短版）"""
-    play_tone(660, 0.10)   # E5
-    time.sleep(0.04)
-    play_tone(660, 0.10)   # E5 again
-    time.sleep(0.04)
-    play_tone(660, 0.10)   # E5 again
-    time.sleep(0.10)
-
-    play_tone(510, 0.10)   # C5
-    time.sleep(0.04)
-    play_tone(660, 0.10)   # E5
-    time.sleep(0.04)
-    play_tone(770, 0.12)   # G5 (Mario trademark upward!)
+    sfx.play(SFX_STARTUP_MARIO)
 
 def play_tone(freq, duration, volume=0.3):
-    """播放一个固定频率的方波音调"""
-    buzzer.frequency = freq
-    buzzer.duty_cycle = int(65535 * volume)  # 0~65535
-    time.sleep(duration)
-    buzzer.duty_cycle = 0  # 关掉声音
+    """排队播放一个固定频率的方波音调（不阻塞）"""
+    sfx.play(((freq, duration),), volume)
 
 def sfx_move_ok():
     """正确完成一个动作时的短“滴”声"""
-    play_tone(1400, 0.05, 0.25)
+    sfx.play(SFX_MOVE_OK, 0.25)
 
 def sfx_level_clear():
     """关卡通过：上升的小旋律"""
-    play_tone(800, 0.08)
-    time.sleep(0.03)
-    play_tone(1000, 0.08)
-    time.sleep(0.03)
-    play_tone(1300, 0.1)
+    sfx.play(SFX_LEVEL_CLEAR)
 
 def sfx_game_over():
     """Game Over：下降的“失败”音"""
-    play_tone(600, 0.12)
-    time.sleep(0.04)
-    play_tone(400, 0.18)
+    sfx.play(SFX_GAME_OVER)
 
 def sfx_game_win():
     """通关所有关卡：胜利音效"""
-    play_tone(900, 0.08)
-    time.sleep(0.03)
-    play_tone(1200, 0.08)
-    time.sleep(0.03)
-    play_tone(1500, 0.12)
+    sfx.play(SFX_GAME_WIN)
 
 
 # ---------- NeoPixel 工具函数 ----------
 
 def pixels_off():
-    for i in range(NUM_PIXELS):
-        pixels[i] = (0, 0, 0)
+    pixel_fx.off()
 
 def pixels_solid(color):
-    for i in range(NUM_PIXELS):
-        pixels[i] = color
+    pixel_fx.solid(color)
+
+def pixels_fade(color, duration=0.3):
+    pixel_fx.fade(color, duration)
 
 def pixels_flash(color, times=3, delay=0.1):
-    for _ in range(times):
-        pixels_solid(color)
-        time.sleep(delay)
-        pixels_off()
-        time.sleep(delay)
+    """闪烁 times 次后熄灭（不阻塞）"""
+    pixel_fx.flash(color, times=times, delay=delay)
 
 def pixels_for_command(cmd):
     """不同动作显示不同颜色（游戏中使用）"""
@@ -429,24 +731,21 @@ def pixels_for_command(cmd):
         pixels_solid((0, 150, 255))   # 蓝：Steady
     elif cmd == MOVE_SHAKE:
         pixels_solid((255, 0, 255))   # 紫：Shake
+    elif cmd == MOVE_TILT_LEFT or cmd == MOVE_TILT_RIGHT:
+        pixels_solid((0, 255, 0))     # 绿：左右倾斜
+    elif cmd == MOVE_TILT_FORWARD or cmd == MOVE_TILT_BACK:
+        pixels_solid((255, 80, 0))    # 橙：前后倾斜
+    elif cmd == MOVE_DOUBLE_TAP:
+        pixels_solid((255, 0, 60))    # 粉红：双击
     else:
         pixels_off()
 
-def pixels_breathe(base_color, t):
+def pixels_breathe(base_color):
     """
     Splash Screen 动画用的呼吸灯效果
-    t = 当前动画已进行时间（秒）
+    亮度按预先算好的表循环，重复调用不会重新开始
     """
-    phase = (math.sin(t * BREATHE_SPEED) + 1.0) * 0.5    # 0~1
-    brightness_scale = 0.2 + 0.8 * phase                 # 0.2~1.0
-
-    r, g, b = base_color
-    for i in range(NUM_PIXELS):
-        pixels[i] = (
-            int(r * brightness_scale),
-            int(g * brightness_scale),
-            int(b * brightness_scale),
-        )
+    pixel_fx.breathe(base_color, BREATHE_SPEED)
 
 #  ---------- 读写文件high score函数 ----------
 
@@ -498,12 +797,20 @@ def check_highscore(current_score):
 
 def show_highscore_board():
     clear_menu()
-    status_label.text = "HIGH SCORES"
+    set_text(status_label, "HIGH SCORES")
     for i, entry in enumerate(highscores[:3]):
-        menu_labels[i].text = "{}. {}  {}".format(
+        set_text(menu_labels[i], "{}. {}  {}".format(
             i + 1, entry["name"], entry["score"]
-        )
-    center_label.text = "Press → Menu"
+        ))
+    set_text(center_label, "Press → Menu")
+
+def quit_to_menu():
+    """长按：放弃这一局，回到菜单（分数不进排行榜）"""
+    global score, selected_menu_index, state
+    score = 0
+    selected_menu_index = 1
+    draw_menu(selected_menu_index)
+    state = STATE_MENU
 
 # ------- 玩家名字编辑 ---------
 def player_initials_str():
@@ -512,28 +819,28 @@ def player_initials_str():
 
 def show_name_input():
     clear_menu()
-    status_label.text = "SET PLAYER"
+    set_text(status_label, "SET PLAYER")
 
     s = player_initials_str()
     if player_pos == 0:
-        center_label.text = ">{} {} {}".format(s[0], s[1], s[2])
+        set_text(center_label, ">{} {} {}".format(s[0], s[1], s[2]))
     elif player_pos == 1:
-        center_label.text = "{} >{} {}".format(s[0], s[1], s[2])
+        set_text(center_label, "{} >{} {}".format(s[0], s[1], s[2]))
     else:
-        center_label.text = "{} {} >{}".format(s[0], s[1], s[2])
+        set_text(center_label, "{} {} >{}".format(s[0], s[1], s[2]))
 
     # 提示放在最下面一行，避免和中间的 A A A 重叠
-    menu_labels[0].text = ""
-    menu_labels[1].text = ""
-    menu_labels[2].text = "Rot:A-Z  Press:OK"
+    set_text(menu_labels[0], "")
+    set_text(menu_labels[1], "")
+    set_text(menu_labels[2], "Rot:A-Z  Press:OK")
 
 
 # 启动时先进入 Splash 状态
 state = STATE_SPLASH
-splash_start_time = time.monotonic()
+splash_start_time = ticks_ms()
 
-status_label.text = ""
-center_label.text = "DIFFUSER"  # 或你的游戏名字
+set_text(status_label, "")
+set_text(center_label, "DIFFUSER")  # 或你的游戏名字
 clear_menu()  # 菜单先清空
 
 sfx_startup_mario() # 开机马里奥音效（只播放一次）
@@ -543,101 +850,125 @@ load_highscores()
 
 # ---------- while True: 主循环 ----------
 while True:
-    now = time.monotonic()
-
-    # 1. 旋钮更新
-    dial_changed = False
-    changed = encoder.update()
-    position = encoder.position
-
-    if changed:
-        if state == STATE_MENU:
-            if position != last_position:
-                delta = position - last_position
-
-                if delta > 0:
-                    selected_menu_index += 1
-                elif delta < 0:
-                    selected_menu_index -= 1
-
-                # 菜单共有 4 行：0=Player, 1=EASY, 2=MEDIUM, 3=HARD
-                if selected_menu_index < 0:
-                    selected_menu_index = 0
-                if selected_menu_index > 3:
-                    selected_menu_index = 3
-
-                last_position = position
-                draw_menu(selected_menu_index)
-        else:
-            # 游戏中，把旋转视作 DIAL 动作的输入事件
-            dial_changed = True
-            last_position = position
-
+    now = ticks_ms()
+    loop_state = state
+    if PROFILE:
+        profiler.begin()
+
+    # 0. 音效推进（非阻塞）
+    sfx.update(now)
+    pixel_fx.update(now)
+    if PROFILE:
+        profiler.span(SPAN_AUDIO)
+
+    # 1. 旋钮 / 按钮 → 事件队列
+    inputs.poll_encoder(now)
+    if PROFILE:
+        profiler.span(SPAN_ENCODER)
+    inputs.poll_button(now)
+    if PROFILE:
+        profiler.span(SPAN_BUTTON)
+
+    # 2. 加速度：只有当前命令需要时才读，各检测的结果变成 SHAKE / STILL / TILT / TAP 事件；
+    #    关卡介绍期间读来做后台校准
+    need_motion = False
+    need_tilt = False
+    need_tap = False
+    motion_wanted = EV_NONE
+    if state == STATE_WAIT_INPUT:
+        cmd = current_sequence[current_cmd_index]
+        motion_wanted = MOTION_EVENT.get(cmd, EV_NONE)
+        need_motion = (cmd == MOVE_STEADY or cmd == MOVE_SHAKE)
+        need_tilt = cmd in TILT_DIRECTION
+        need_tap = (cmd == MOVE_DOUBLE_TAP)
+    if state == STATE_INIT_LEVEL and not baseline_est.settled:
+        accel_fifo.start()
+        calibration_feed(now)
+    elif need_motion and motion_hw is not None:
+        if not motion_hw.armed:
+            motion_hw.arm()
+        push_int_events(motion_hw.poll(), now)
+    elif need_motion or need_tilt:
+        accel_fifo.start()
+        accel_update(now)
+        # drain 顺带读了 INT_SOURCE（会清掉锁存位），把双击等结果接着交出去
+        push_int_events(accel_ints.latched(accel_fifo.source), now)
+        if shake_swings.take():
+            push_motion(EV_SHAKE, now)
+        if steady_var.take():
+            push_motion(EV_STILL, now)
+        if tilt_axis.take():
+            push_motion(EV_TILT, now, tilt_axis.confirmed)
+    elif need_tap:
+        # 每帧一次单字节读；命令开始前的敲击不算
+        accel_fifo.stop()
+        if not tap_cleared:
+            accel_ints.clear()
+            tap_cleared = True
+        push_int_events(accel_ints.poll(), now)
+    else:
+        accel_fifo.stop()
+        if motion_hw is not None:
+            motion_hw.disarm()
+    if PROFILE:
+        profiler.span(SPAN_ACCEL)
 
-    # 2. 按钮边沿检测
-    raw = button.value
-    button_pressed = (last_button_value is True) and (raw is False)
-    last_button_value = raw
+    # 每次循环处理一个事件，没处理完的留在队列里下一圈继续，不会丢
+    ev = inputs.pop()
 
     # 3. 状态机
     if state == STATE_SPLASH:
-        elapsed = now - splash_start_time
+        elapsed = ticks_diff(now, splash_start_time)
 
-        # ① 文本从左往右滑入
-        text_duration = 1.8
-        t_prog = min(elapsed / text_duration, 1.0)
-        text_x = int(-60 + (8 + 60) * t_prog)
-        center_label.x = text_x
-        center_label.text = "DIFFUSER"
+        # ① 文本从左往右滑入（时长 ms，全用整数算位置）
+        text_duration = 1800
+        text_x = -60 + (8 + 60) * min(elapsed, text_duration) // text_duration
+        set_x(center_label, text_x)
+        set_text(center_label, "DIFFUSER")
 
         # ② 扫描条从左往右移动
-        bar_duration = 2.2
-        b_prog = min(elapsed / bar_duration, 1.0)
-        splash_bar.x = int(-16 + (128 + 16) * b_prog)
+        bar_duration = 2200
+        set_x(splash_bar, -16 + (128 + 16) * min(elapsed, bar_duration) // bar_duration)
 
         # ③ 顶部标题固定
-        status_label.text = "Bomb Diffuse Game"
+        set_text(status_label, "Bomb Diffuse Game")
 
         # ④ 炸弹 ASCII 图标变形
-        frame_index = int(elapsed / 0.2) % len(BOMB_FRAMES)
-        bomb_label.text = BOMB_FRAMES[frame_index]
+        frame_index = elapsed // 200 % len(BOMB_FRAMES)
+        set_text(bomb_label, BOMB_FRAMES[frame_index])
 
         # ⑤ NeoPixel 呼吸效果
-        pixels_breathe((255, 80, 0), elapsed)
+        pixels_breathe((255, 80, 0))
 
-        # ⑥ 动画结束后 → 直接进入名字输入（不是菜单）
-        if elapsed > 3.0:
-            bomb_label.text = ""
-            center_label.text = ""
-            center_label.x = 6
-            splash_bar.x = -16
-            pixels_solid((0, 0, 40))
+        # ⑥ 动画结束后（或双击跳过）→ 直接进入名字输入（不是菜单）
+        if elapsed > 3000 or ev == EV_MULTI_CLICK:
+            set_text(bomb_label, "")
+            set_text(center_label, "")
+            set_x(center_label, 6)
+            set_x(splash_bar, -16)
+            pixels_fade((0, 0, 40))
 
             # ★ 改这里：直接进入名字输入
             player_pos = 0
-            player_last_position = encoder.position
             show_name_input()
             state = STATE_NAME_INPUT
 
 
     elif state == STATE_NAME_INPUT:
         # 旋钮：修改当前字母
-        if changed:
-            delta = position - player_last_position
-            if delta != 0:
-                c = player_initials[player_pos]
-                code = ord(c) - ord("A")
-                if delta > 0:
-                    code += 1
-                elif delta < 0:
-                    code -= 1
-                code %= 26
-                player_initials[player_pos] = chr(ord("A") + code)
-                show_name_input()
-            player_last_position = position
+        if ev == EV_DIAL_CW or ev == EV_DIAL_CCW:
+            c = player_initials[player_pos]
+            code = ord(c) - ord("A")
+            if ev == EV_DIAL_CW:
+                code += 1
+            else:
+                code -= 1
+            code %= 26
+            player_initials[player_pos] = chr(ord("A") + code)
+            show_name_input()
 
         # 短按 → 下一个字母
-        if button_pressed:
+        elif ev == EV_CLICK:
             if player_pos < 2:
                 player_pos += 1
                 show_name_input()
@@ -650,9 +981,29 @@ while True:
 
 
     elif state == STATE_MENU:
+        # 长按 → 回去改名字
+        if ev == EV_LONG_PRESS:
+            player_pos = 0
+            show_name_input()
+            state = STATE_NAME_INPUT
+
+        elif ev == EV_DIAL_CW or ev == EV_DIAL_CCW:
+            if ev == EV_DIAL_CW:
+                selected_menu_index += 1
+            else:
+                selected_menu_index -= 1
+
+            # 菜单共有 4 行：0=Player, 1=EASY, 2=MEDIUM, 3=HARD
+            if selected_menu_index < 0:
+                selected_menu_index = 0
+            if selected_menu_index > 3:
+                selected_menu_index = 3
+
+            draw_menu(selected_menu_index)
+
         # ★ 菜单现在只用来选难度，不再有 Player 选项
         # 光标在难度行 (1=EASY, 2=MEDIUM, 3=HARD) + 短按 → 开始游戏
-        if button_pressed and (selected_menu_index >= 1):
+        elif ev == EV_CLICK and (selected_menu_index >= 1):
             #score = 0
             selected_diff_index = selected_menu_index - 1
 
@@ -662,62 +1013,69 @@ while True:
 
             level_cfg = LEVELS[current_level_index]
             current_level_num = level_cfg["level_num"]
-            time_limit = level_cfg["time_limit"]
+            time_limit_ms = to_ms(level_cfg["time_limit"])
 
             current_sequence = generate_sequence_for_level(level_cfg)
             required_commands = len(current_sequence)
             current_cmd_index = 0
 
-            calibrate_baseline()
+            calibration_begin()
             level_start_time = now
-            steady_start_time = None
+            reset_motion()
 
             show_level_intro()
             state = STATE_INIT_LEVEL
 
     elif state == STATE_INIT_LEVEL:
-        if now - level_start_time > 1.0:
+        if ev == EV_LONG_PRESS:
+            quit_to_menu()
+        elif ticks_diff(now, level_start_time) > 1000:
+            calibration_finish()
             level_start_time = now
-            steady_start_time = None
+            reset_motion()
+            hud_invalidate()
             state = STATE_WAIT_INPUT
 
     elif state == STATE_WAIT_INPUT:
-        elapsed = now - level_start_time
-        remaining = time_limit - elapsed
+        remaining = time_limit_ms - ticks_diff(now, level_start_time)
 
         show_level_play(remaining)
+        if PROFILE:
+            profiler.span(SPAN_RENDER)
 
         cmd = current_sequence[current_cmd_index]
         success_this_cmd = False
 
         if cmd == MOVE_CUT_WIRE:
-            if button_pressed:
+            if ev == EV_CLICK:
                 success_this_cmd = True
         elif cmd == MOVE_DIAL:
-            if dial_changed:
+            if ev == EV_DIAL_CW or ev == EV_DIAL_CCW:
                 success_this_cmd = True
         elif cmd == MOVE_STEADY:
-            diff_mag = accel_diff_mag_filtered()
-            if diff_mag < STEADY_DIFF_THRESH:
-                if steady_start_time is None:
-                    steady_start_time = now
-                if (now - steady_start_time) >= STEADY_HOLD_TIME:
-                    success_this_cmd = True
-            else:
-                # 一旦超出阈值，重新计时
-                steady_start_time = None
-
+            # 最近 STEADY_HOLD_MS 的抖动（方差）低于 STEADY_DIFF_THRESH 才会有 STILL 事件
+            if ev == EV_STILL:
+                success_this_cmd = True
         elif cmd == MOVE_SHAKE:
-            diff_mag = accel_diff_mag_filtered()
-            if diff_mag > SHAKE_DIFF_THRESH:
+            if ev == EV_SHAKE:
+                success_this_cmd = True
+        elif cmd in TILT_DIRECTION:
+            if ev == EV_TILT and inputs.last_value == TILT_DIRECTION[cmd]:
+                success_this_cmd = True
+        elif cmd == MOVE_DOUBLE_TAP:
+            if ev == EV_TAP:
                 success_this_cmd = True
 
+        # 长按 → 放弃这一局
+        if ev == EV_LONG_PRESS:
+            quit_to_menu()
+
         # 当前命令完成 → correct move
-        if success_this_cmd:
+        elif success_this_cmd:
             score += POINT_PER_COMMAND
             sfx_move_ok()
             current_cmd_index += 1
-            steady_start_time = None
+            reset_motion()
 
             if current_cmd_index >= required_commands:
                 score += POINT_PER_LEVEL
@@ -737,21 +1095,21 @@ while True:
             state = STATE_LEVEL_RESULT
 
     elif state == STATE_LEVEL_RESULT:
-        if button_pressed:
+        if ev == EV_CLICK:
             if result_is_success and not is_last:
                 # ★ 过关但还有下一关 → 继续下一关（不显示排行榜）
                 current_level_index += 1
                 level_cfg = LEVELS[current_level_index]
                 current_level_num = level_cfg["level_num"]
-                time_limit = level_cfg["time_limit"]
+                time_limit_ms = to_ms(level_cfg["time_limit"])
 
                 current_sequence = generate_sequence_for_level(level_cfg)
                 required_commands = len(current_sequence)
                 current_cmd_index = 0
 
-                calibrate_baseline()
+                calibration_begin()
                 level_start_time = now
-                steady_start_time = None
+                reset_motion()
 
                 show_level_intro()
                 state = STATE_INIT_LEVEL
@@ -777,13 +1135,25 @@ while True:
 
 
     elif state == STATE_HS_SHOW:
-        if button_pressed:
+        if ev == EV_CLICK:
             # ★ 排行榜后 → 回到名字输入（新一轮游戏）
             score = 0
             player_pos = 0
             player_initials = ["A", "A", "A"]  # 重置名字
-            player_last_position = encoder.position
             show_name_input()
             state = STATE_NAME_INPUT
 
+    if PROFILE:
+        profiler.span(SPAN_LOGIC)
+
+    # 4. 渲染：有改动且到了帧时间才 refresh；等输入时不挡传感器下一次读 FIFO
+    bus.priority = (state == STATE_WAIT_INPUT)
+    bus.sensor_due = accel_fifo.next_due
+    frame_pacer.update(now)
+
+    if PROFILE:
+        profiler.span(SPAN_DISPLAY)
+        profiler.end(loop_state)
+        profiler.poll_serial()
+
     time.sleep(0.005)
\ No newline at end of file